@@ -0,0 +1,122 @@
+"""
+Chunks embedded per second by the local ONNX Runtime provider against the OpenAI path.
+The OpenAI path talks to a local stand-in server that answers after a fixed network latency
+plus a per-input service time, so both sides run without network access or an API key.
+
+    python -m benchmarks.embeddings --chunks 1024 --latency 0.3 --per-item-ms 0.5
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from langchain.embeddings import OpenAIEmbeddings
+
+from reach_core.memory.local import LocalEmbeddings
+
+_WORDS = (
+    "research agent scraper page content report model source context query result event loop "
+    "process worker parse html text paragraph header token chunk cache network latency server "
+    "market data analysis growth revenue policy climate energy health interest rates inflation"
+).split()
+
+
+class StandInEmbeddingsServer:
+    """
+    Minimal server for POST /embeddings in the OpenAI format, returning random unit vectors
+    after latency seconds plus per_item seconds for every input
+    """
+    def __init__(self, latency=0.3, per_item=0.0005, dimensions=1536):
+        self.latency = latency
+        self.per_item = per_item
+        self.dimensions = dimensions
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+                server.requests += 1
+                time.sleep(server.latency + server.per_item * len(inputs))
+                rng = random.Random(len(inputs))
+                data = [
+                    {"object": "embedding", "index": i, "embedding": server._vector(rng)} for i in range(len(inputs))
+                ]
+                payload = json.dumps({
+                    "object": "list", "data": data, "model": body.get("model", ""),
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def _vector(self, rng):
+        vector = [rng.gauss(0, 1) for _ in range(self.dimensions)]
+        norm = sum(x * x for x in vector) ** 0.5
+        return [x / norm for x in vector]
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def make_chunks(count, seed=0):
+    """Chunks of 200 to 1000 characters, the sizes RunIndex produces"""
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words, size = [], rng.randint(200, 1000)
+        while sum(map(len, words)) + len(words) < size:
+            words.append(rng.choice(_WORDS))
+        chunks.append(" ".join(words).capitalize() + ".")
+    return chunks
+
+
+def _time(embeddings, chunks):
+    embeddings.embed_documents(chunks[:8])
+    started = time.perf_counter()
+    vectors = embeddings.embed_documents(chunks)
+    assert len(vectors) == len(chunks)
+    return len(chunks) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=1024)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2", help="local model")
+    parser.add_argument("--threads", type=int, default=None, help="local intra-op threads, defaults to all CPUs")
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per request of the stand-in server")
+    parser.add_argument("--per-item-ms", type=float, default=0.5, help="milliseconds per input of the stand-in")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    print(f"{len(chunks)} chunks, {sum(map(len, chunks)) / len(chunks):.0f} characters on average")
+
+    for quantize in (False, True):
+        local = LocalEmbeddings(args.model, quantize=quantize, threads=args.threads)
+        print(f"{'local int8' if local.quantized else 'local fp32':>12}  {_time(local, chunks):8.1f} chunks/s")
+
+    with StandInEmbeddingsServer(args.latency, args.per_item_ms / 1000) as server:
+        remote = OpenAIEmbeddings(openai_api_base=server.url, openai_api_key="benchmark")
+        rate = _time(remote, chunks)
+        print(f"{'openai':>12}  {rate:8.1f} chunks/s  ({server.requests} requests, "
+              f"{args.latency}s + {args.per_item_ms}ms per chunk simulated)")
+
+
+if __name__ == "__main__":
+    main()
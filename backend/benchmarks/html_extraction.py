@@ -0,0 +1,62 @@
+"""
+Microbenchmark of the single-pass lxml walker against the BeautifulSoup extraction path
+over a corpus of large html pages, with a check that both extract the same text.
+Each page is parsed with the charset its server declared, None for most pages, so both parsers
+have to find the encoding themselves. The generated corpus stands in for real saved pages, see
+benchmarks/pages.py; run it on your own with --pages-dir.
+
+    python -m benchmarks.html_extraction --pages 20 --repeat 3
+"""
+import argparse
+import time
+
+from reach_core.scraper.parsing import parse_html, parse_html_lxml
+
+from .pages import load_pages
+
+
+def _time(parse, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for page in pages:
+            parse(page.content, page.encoding)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="pages generated for the corpus")
+    parser.add_argument("--page-bytes", type=int, default=500_000, help="size of each generated page")
+    parser.add_argument("--pages-dir", help="directory of saved .html pages to use instead")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per parser, the best one is reported")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.page_bytes, args.pages_dir)
+    megabytes = sum(len(page.content) for page in pages) / 1e6
+    print(f"{len(pages)} pages, {megabytes:.1f} MB")
+
+    # BeautifulSoup collapses whitespace-only strings between inline tags, so the double-space
+    # phrase breaks can differ while the extracted words are the same. Differing words mean the
+    # parsers decoded or extracted the page differently.
+    differences = {}
+    for page in pages:
+        fast, soup = parse_html_lxml(page.content, page.encoding), parse_html(page.content, page.encoding)
+        counts = differences.setdefault(page.variant, [0, 0, 0])
+        counts[0] += 1
+        counts[1] += fast != soup
+        counts[2] += fast.split() != soup.split()
+    print(f"{'variant':>20}  {'pages':>5}  {'text differs':>12}  {'words differ':>12}")
+    for variant, (count, exact, words) in differences.items():
+        print(f"{variant:>20}  {count:5d}  {exact:12d}  {words:12d}")
+
+    results = {}
+    for name, parse in (("beautifulsoup", parse_html), ("lxml walker", parse_html_lxml)):
+        results[name] = _time(parse, pages, args.repeat)
+        print(f"{name:>14}  {len(pages) / results[name]:8.1f} pages/s  {megabytes / results[name]:8.1f} MB/s")
+    print(f"speedup: {results['beautifulsoup'] / results['lxml walker']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
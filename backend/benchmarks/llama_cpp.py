@@ -0,0 +1,205 @@
+"""
+Throughput of the llama.cpp provider against a stand-in server that models llama.cpp's slots:
+each slot serves one request at a time and keeps the KV cache of its last prompt, so only the
+part of a prompt after the prefix it shares with that cache is evaluated again.
+Compares the pooled provider (cache_prompt, server-picked slot) with one new client per call and
+no prompt cache, and with pinning every system prompt to one slot.
+
+    python -m benchmarks.llama_cpp --slots 4 --concurrency 8
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import httpx
+
+from reach_core.llm_provider.cpp_inference.cpp_inference import CplusplusProvider, get_llama_cpp_client
+
+# llama.cpp's default slot_prompt_similarity: below it a request goes to the least recently used slot
+PROMPT_SIMILARITY = 0.5
+
+
+class StandInLlamaCpp:
+    """
+    Minimal llama.cpp server answering POST /completion, with simulated prompt evaluation and
+    generation times. id_slot -1 picks the idle slot whose cached prompt shares the longest prefix
+    with the request, like llama.cpp; a request for a given slot waits until that slot is idle.
+    """
+    def __init__(self, slots=4, prompt_tps=2000, generation_tps=200, chars_per_token=4):
+        """
+        Args:
+            slots: requests processed in parallel
+            prompt_tps: prompt tokens evaluated per second by a slot
+            generation_tps: tokens generated per second by a slot
+            chars_per_token: characters counted as one token
+        """
+        self.prompt_tps = prompt_tps
+        self.generation_tps = generation_tps
+        self.chars_per_token = chars_per_token
+        self.cache = [""] * slots
+        self.last_used = [0.0] * slots
+        self.busy = [False] * slots
+        self.evaluated = 0
+        self._idle = None
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def reset(self):
+        self.cache = [""] * len(self.cache)
+        self.evaluated = 0
+
+    async def __aenter__(self):
+        self._idle = asyncio.Condition()
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def _pick(self, prompt, requested):
+        idle = [slot for slot, busy in enumerate(self.busy) if not busy]
+        if requested >= 0:
+            return requested if requested in idle else None
+        if not idle:
+            return None
+        best = max(idle, key=lambda slot: len(os.path.commonprefix([self.cache[slot], prompt])))
+        if len(os.path.commonprefix([self.cache[best], prompt])) >= PROMPT_SIMILARITY * len(prompt):
+            return best
+        return min(idle, key=lambda slot: self.last_used[slot])
+
+    async def _complete(self, body):
+        prompt = body["prompt"]
+        async with self._idle:
+            await self._idle.wait_for(lambda: self._pick(prompt, body.get("id_slot", -1)) is not None)
+            slot = self._pick(prompt, body.get("id_slot", -1))
+            self.busy[slot] = True
+        try:
+            cached = len(os.path.commonprefix([self.cache[slot], prompt])) if body.get("cache_prompt") else 0
+            new_tokens = (len(prompt) - cached) / self.chars_per_token
+            self.evaluated += new_tokens
+            tokens = max(body.get("n_predict", 0), 0)
+            await asyncio.sleep(new_tokens / self.prompt_tps + tokens / self.generation_tps)
+            self.cache[slot] = prompt
+            return " ".join(["token"] * tokens)
+        finally:
+            async with self._idle:
+                self.busy[slot] = False
+                self.last_used[slot] = time.monotonic()
+                self._idle.notify_all()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = dict(
+                    line.lower().split(": ", 1) for line in head.decode("latin-1").split("\r\n")[1:] if ": " in line
+                )
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+                content = await self._complete(body)
+                if body.get("stream"):
+                    events = [{"content": content, "stop": False}, {"content": "", "stop": True}]
+                    payload = b"".join(b"data: " + json.dumps(event).encode("utf-8") + b"\n\n" for event in events)
+                    content_type = "text/event-stream"
+                else:
+                    payload = json.dumps({"content": content, "stop": True}).encode("utf-8")
+                    content_type = "application/json"
+                writer.write(
+                    f"HTTP/1.1 200 OK\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii") + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class UncachedProvider(CplusplusProvider):
+    """The provider before pooling: a new client per call and no prompt cache"""
+    async def send_request(self, messages):
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=600) as client:
+            payload = {**self._payload(messages, False), "cache_prompt": False}
+            response = await client.post("/completion", json=payload)
+            response.raise_for_status()
+            return response.json()["content"]
+
+
+class PinnedProvider(CplusplusProvider):
+    """Pins every system prompt to one slot, so calls sharing it queue on that slot"""
+    slots = 4
+
+    def _payload(self, messages, stream):
+        payload = super()._payload(messages, stream)
+        system = "\0".join(m["content"] for m in messages if m["role"] == "system")
+        digest = hashlib.blake2b(system.encode("utf-8"), digest_size=8).digest()
+        payload["id_slot"] = int.from_bytes(digest, "big") % self.slots
+        return payload
+
+
+def make_calls(roles, calls_per_role, role_chars=12_000):
+    """
+    Report-writing workload: each role prompt is long and shared by a burst of calls, like the
+    chunk summaries of one sub-query, with a short user message of its own
+    """
+    calls = []
+    for role in range(roles):
+        system = f"You are research role {role}. " + "Follow the long shared instructions. " * (role_chars // 37)
+        calls.append([
+            [{"role": "system", "content": system}, {"role": "user", "content": f"Summarize chunk {i} of role {role}."}]
+            for i in range(calls_per_role)
+        ])
+    return calls
+
+
+async def run(args):
+    async with StandInLlamaCpp(args.slots, args.prompt_tps, args.generation_tps) as server:
+        os.environ["LLAMA_CPP_BASE_URL"] = server.url
+        os.environ["LLAMA_CPP_MAX_CONNECTIONS"] = str(args.concurrency)
+        PinnedProvider.slots = args.slots
+        calls = make_calls(args.roles, args.calls_per_role)
+        print(f"{args.roles} role prompts of {len(calls[0][0][0]['content'])} characters, "
+              f"{args.calls_per_role} calls each, {args.slots} slots, {args.concurrency} calls in flight")
+        print(f"{'provider':>10}  {'calls/s':>8}  {'prompt tokens evaluated':>24}")
+        for name, provider_class in (("uncached", UncachedProvider), ("pinned", PinnedProvider),
+                                     ("provider", CplusplusProvider)):
+            server.reset()
+            provider = provider_class("model", 0, args.n_predict)
+            limit = asyncio.Semaphore(args.concurrency)
+
+            async def call(messages):
+                async with limit:
+                    return await provider.get_chat_response(messages, stream=False)
+
+            started = time.perf_counter()
+            for role_calls in calls:
+                await asyncio.gather(*(call(messages) for messages in role_calls))
+            elapsed = time.perf_counter() - started
+            count = sum(map(len, calls))
+            print(f"{name:>10}  {count / elapsed:8.1f}  {server.evaluated:24.0f}")
+        # The pooled client keeps its connections alive: close it before the server goes away
+        await get_llama_cpp_client(server.url).aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slots", type=int, default=4, help="parallel slots of the stand-in server")
+    parser.add_argument("--concurrency", type=int, default=8, help="calls in flight at once")
+    parser.add_argument("--roles", type=int, default=3, help="distinct system prompts")
+    parser.add_argument("--calls-per-role", type=int, default=16)
+    parser.add_argument("--n-predict", type=int, default=32, help="tokens generated per call")
+    parser.add_argument("--prompt-tps", type=float, default=2000, help="prompt tokens evaluated per second per slot")
+    parser.add_argument("--generation-tps", type=float, default=200, help="tokens generated per second per slot")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
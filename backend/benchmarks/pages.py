@@ -0,0 +1,122 @@
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+# Deterministic corpus of large, messy html pages for the scraper benchmarks.
+# It stands in for a corpus of real saved pages, which cannot be redistributed with the repo:
+# pass --pages-dir to run the benchmarks on pages you saved yourself. To keep the differences
+# real pages expose between parsers, the corpus mixes how pages declare their encoding and
+# puts whitespace-only text and entities between inline tags.
+
+_WORDS = (
+    "research agent scraper page content report model source context query result event loop "
+    "process worker parse html text paragraph header token chunk cache network latency server "
+    "client request response market data analysis growth revenue policy climate energy health "
+    "café naïve résumé Zürich façade señor déjà crème"
+).split()
+
+# Separators between inline parts of a paragraph, including whitespace-only strings between tags
+_SEPARATORS = ("  ", " ", "\n", "&nbsp;", " <span> </span> ", "\n\t")
+
+
+@dataclass
+class Page:
+    """A raw html page, the charset its server declared (None if it declared none) and its variant"""
+    content: bytes
+    encoding: str | None
+    variant: str
+
+
+# Variant -> (body encoding, charset in the Content-Type header, meta tag, BOM, typographic quotes).
+# Servers often send no charset, leaving the parser to find it in the page or guess.
+VARIANTS = {
+    "utf-8 declared": ("utf-8", "utf-8", "<meta charset='utf-8'>", False, True),
+    "utf-8 undeclared": ("utf-8", None, "", False, True),
+    "utf-8 bom": ("utf-8", None, "", True, True),
+    "windows-1252 meta": (
+        "windows-1252", None, "<meta http-equiv='Content-Type' content='text/html; charset=windows-1252'>",
+        False, True,
+    ),
+    "latin-1 undeclared": ("latin-1", None, "", False, False),
+}
+
+
+def _sentence(rng, quotes):
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(6, 24))]
+    sentence = " ".join(words).capitalize() + "."
+    if quotes and rng.random() < 0.2:
+        sentence = f"“{sentence}” it’s said."
+    return sentence
+
+
+def _inline(rng, quotes):
+    # Paragraph text broken up by the inline markup real pages are full of
+    parts = []
+    for _ in range(rng.randint(2, 8)):
+        sentence = _sentence(rng, quotes)
+        tag = rng.choice(("", "", "a", "em", "strong", "span"))
+        if tag == "a":
+            parts.append(f'<a href="/{rng.choice(_WORDS)}">{sentence}</a>')
+        elif tag:
+            parts.append(f"<{tag}>{sentence}</{tag}>")
+        else:
+            parts.append(sentence)
+    return "".join(part + rng.choice(_SEPARATORS) for part in parts)
+
+
+def make_page(rng, target_bytes=500_000, variant="utf-8 declared"):
+    """
+    Builds an html page of about target_bytes with navigation, scripts, styles, comments,
+    tables and deeply nested article markup around the paragraphs and headers, encoded and
+    declared as the variant says
+    """
+    encoding, declared, meta, bom, quotes = VARIANTS[variant]
+    head = (
+        f"<!DOCTYPE html><html><head>{meta}<title>Benchmark page</title>"
+        "<style>body { font-family: sans-serif; } .nav li { display: inline; }</style>"
+        "<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>"
+        "</head><body>"
+    )
+    nav = "<nav class='nav'><ul>" + "".join(
+        f"<li><a href='/{word}'>{word}</a></li>" for word in rng.sample(_WORDS, 12)
+    ) + "</ul></nav>"
+    parts = [head, nav]
+    size = len(head) + len(nav)
+    while size < target_bytes:
+        depth = rng.randint(1, 6)
+        level = rng.randint(1, 5)
+        block = ["<div class='wrapper'>" * depth, f"<h{level}>{_sentence(rng, quotes)}</h{level}>"]
+        for _ in range(rng.randint(2, 10)):
+            block.append(f"<p>{_inline(rng, quotes)}</p>")
+            if rng.random() < 0.2:
+                block.append(f"<!-- {_sentence(rng, quotes)} -->")
+            if rng.random() < 0.1:
+                block.append(f"<script>var x = '{_sentence(rng, quotes)}';</script>")
+        if rng.random() < 0.3:
+            rows = "".join(
+                f"<tr><td>{rng.choice(_WORDS)}</td><td>{rng.randint(0, 10_000)}</td></tr>" for _ in range(10)
+            )
+            block.append(f"<table>{rows}</table>")
+        block.append("</div>" * depth)
+        chunk = "".join(block)
+        parts.append(chunk)
+        size += len(chunk)
+    parts.append("<footer><p>Copyright</p></footer></body></html>")
+    content = "".join(parts).encode(encoding)
+    return Page(b"\xef\xbb\xbf" + content if bom else content, declared, variant)
+
+
+def load_pages(count=20, target_bytes=500_000, pages_dir=None, seed=0):
+    """
+    Returns:
+        list of Page, read from pages_dir/*.html if given (with no declared charset, as saved
+        pages carry no headers), generated otherwise with the variants in turn
+    """
+    if pages_dir:
+        paths = sorted(Path(pages_dir).glob("*.html"))
+        if not paths:
+            raise ValueError(f"No .html files in {pages_dir}")
+        return [Page(path.read_bytes(), None, path.name) for path in paths]
+    rng = random.Random(seed)
+    variants = list(VARIANTS)
+    return [make_page(rng, target_bytes, variants[i % len(variants)]) for i in range(count)]
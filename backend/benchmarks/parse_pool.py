@@ -0,0 +1,62 @@
+"""
+Pages parsed per second by the ParsePool as the number of worker processes grows,
+against parsing inline on the event loop.
+
+    python -m benchmarks.parse_pool --pages 40 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import time
+
+from reach_core.scraper.parsing import ParsePool, parse_html_fast
+from reach_core.utils.cpu import available_cpus
+
+from .pages import load_pages
+
+
+async def _inline(pages):
+    started = time.perf_counter()
+    for page in pages:
+        parse_html_fast(page.content, page.encoding)
+    return time.perf_counter() - started
+
+
+async def _pooled(pages, workers):
+    pool = ParsePool(workers)
+    try:
+        # Spawn the workers before timing, as the shared pool does on the first scrape
+        await asyncio.gather(*(pool.run(parse_html_fast, page.content, page.encoding) for page in pages[:workers]))
+        started = time.perf_counter()
+        await asyncio.gather(*(pool.run(parse_html_fast, page.content, page.encoding) for page in pages))
+        return time.perf_counter() - started
+    finally:
+        pool.shutdown()
+
+
+async def run(pages, worker_counts):
+    elapsed = await _inline(pages)
+    print(f"{'inline':>8}  {len(pages) / elapsed:8.1f}")
+    for workers in worker_counts:
+        elapsed = await _pooled(pages, workers)
+        print(f"{workers:>8}  {len(pages) / elapsed:8.1f}")
+
+
+def main():
+    cpus = available_cpus()
+    default_workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40, help="pages generated for the corpus")
+    parser.add_argument("--page-bytes", type=int, default=500_000, help="size of each generated page")
+    parser.add_argument("--pages-dir", help="directory of saved .html pages to use instead")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers,
+                        help="worker counts to measure")
+    args = parser.parse_args()
+
+    pages = load_pages(args.pages, args.page_bytes, args.pages_dir)
+    print(f"{len(pages)} pages, {sum(len(page.content) for page in pages) / 1e6:.1f} MB, {cpus} cpus available")
+    print(f"{'workers':>8}  {'pages/s':>8}")
+    asyncio.run(run(pages, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput of the StreamingTextSplitter against LangChain's RecursiveCharacterTextSplitter,
+with a check that both produce the same chunks on a document corpus and on randomized inputs.
+
+    python -m benchmarks.splitter --copies 2 --fuzz 400
+"""
+import argparse
+import importlib
+import pydoc
+import random
+import time
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from reach_core.context.splitter import StreamingTextSplitter
+
+_MODULES = (
+    "os", "re", "json", "asyncio", "collections", "argparse", "email", "http.client", "sqlite3", "typing",
+    "logging", "subprocess", "pathlib", "unittest", "decimal", "datetime", "itertools", "functools",
+    "string", "textwrap",
+)
+_WORDS = (
+    "research agent scraper page content report model source context query result event loop "
+    "process worker parse html text paragraph header token chunk cache network latency server"
+).split()
+
+
+def load_documents(seed=0):
+    """pydoc pages of stdlib modules, for their mix of headings, lists and code, plus prose paragraphs"""
+    documents = [pydoc.render_doc(importlib.import_module(name), renderer=pydoc.plaintext) for name in _MODULES]
+    rng = random.Random(seed)
+    for _ in range(30):
+        paragraphs = [
+            " ".join(rng.choice(_WORDS) for _ in range(rng.randint(5, 400))) for _ in range(rng.randint(5, 40))
+        ]
+        documents.append("\n\n".join(paragraphs))
+    return documents
+
+
+def fuzz(iterations, seed=0):
+    """
+    Splits random mixes of words, spaces, line breaks and separator-free runs longer than a chunk
+    Returns:
+        number of inputs where the two splitters disagree
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(iterations):
+        chunk_size = rng.choice((50, 100, 1000))
+        chunk_overlap = rng.choice((0, 10, chunk_size // 10, chunk_size // 2))
+        tokens = ("a", "bb", "word", "x" * rng.randint(1, 3 * chunk_size), " ", "\n", "\n\n", "  ", "\n \n")
+        text = "".join(rng.choices(tokens, weights=(5, 5, 5, 1, 6, 2, 1, 1, 1), k=rng.randint(1, 300)))
+        recursive = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        streaming = StreamingTextSplitter(chunk_size, chunk_overlap)
+        mismatches += recursive.split_text(text) != streaming.split_text(text)
+    return mismatches
+
+
+def _time(split, text, repeat):
+    best, chunks = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = split(text)
+        best = min(best, time.perf_counter() - started)
+    return best, len(chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--copies", type=int, default=2, help="times the corpus is repeated for the timing")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per splitter, the best one is reported")
+    parser.add_argument("--fuzz", type=int, default=400, help="randomized inputs compared, 0 to skip")
+    args = parser.parse_args()
+
+    recursive = RecursiveCharacterTextSplitter(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+    streaming = StreamingTextSplitter(args.chunk_size, args.chunk_overlap)
+
+    documents = load_documents()
+    identical = sum(recursive.split_text(doc) == streaming.split_text(doc) for doc in documents)
+    print(f"documents split identically: {identical}/{len(documents)}")
+    if args.fuzz:
+        print(f"randomized inputs split differently: {fuzz(args.fuzz)}/{args.fuzz}")
+
+    text = "\n\n".join(documents) * args.copies
+    megachars = len(text) / 1e6
+    print(f"timing on {megachars:.1f}M characters")
+    results = {}
+    for name, splitter in (("recursive", recursive), ("streaming", streaming)):
+        results[name], chunks = _time(splitter.split_text, text, args.repeat)
+        print(f"{name:>10}  {megachars / results[name]:8.1f}M chars/s  {chunks} chunks")
+    print(f"speedup: {results['recursive'] / results['streaming']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,11 @@ class Config:
         self.config_file = config_file if config_file else os.getenv("CONFIG_FILE")
         self.retriever = os.getenv("SEARCH_RETRIEVER", "searx")
         self.embedding_provider = os.getenv("EMBEDDING_PROVIDER", "openai")
+        self.local_embedding_model = os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+        self.local_embedding_onnx_file = os.getenv("LOCAL_EMBEDDING_ONNX_FILE", "onnx/model.onnx")
+        self.local_embedding_quantize = os.getenv("LOCAL_EMBEDDING_QUANTIZE", "true").lower() == "true"
+        self.local_embedding_threads = int(os.getenv("LOCAL_EMBEDDING_THREADS", 0))
+        self.local_embedding_batch_size = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", 64))
         self.llm_provider = os.getenv("LLM_PROVIDER", "openai")
         self.fast_llm_model = os.getenv(
             "FAST_LLM_MODEL", "gpt-4o"
@@ -18,8 +23,23 @@ class Config:
         self.smart_llm_model = os.getenv(
             "SMART_LLM_MODEL", "gpt-4o"
         )  # mistral:instruct
+        self.fallback_llm_model = os.getenv("FALLBACK_LLM_MODEL", "")
+        self.llm_max_attempts = int(os.getenv("LLM_MAX_ATTEMPTS", 5))
+        self.llm_retry_base_delay = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))
+        self.llm_retry_max_delay = float(os.getenv("LLM_RETRY_MAX_DELAY", 60))
+        self.llm_error_budget = int(os.getenv("LLM_ERROR_BUDGET", 10))
+        self.llm_error_budget_window = int(os.getenv("LLM_ERROR_BUDGET_WINDOW", 60))
+        self.llm_rpm = int(os.getenv("LLM_RPM", 500))
+        self.llm_tpm = int(os.getenv("LLM_TPM", 450_000))
+        self.llm_initial_concurrency = int(os.getenv("LLM_INITIAL_CONCURRENCY", 8))
+        self.llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", 32))
+        self.llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.llm_cache_disk = os.getenv("LLM_CACHE_DISK", "true").lower() == "true"
+        self.llm_cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 1024))
+        self.llm_cache_ttl = int(os.getenv("LLM_CACHE_TTL", 24 * 60 * 60))
         self.fast_token_limit = int(os.getenv("FAST_TOKEN_LIMIT", 2000))
         self.smart_token_limit = int(os.getenv("SMART_TOKEN_LIMIT", 4000))
+        self.context_token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", 25_000))
         self.browse_chunk_max_length = int(os.getenv("BROWSE_CHUNK_MAX_LENGTH", 8192))
         self.summary_token_limit = int(os.getenv("SUMMARY_TOKEN_LIMIT", 700))
         self.temperature = float(os.getenv("TEMPERATURE", 0.1))
@@ -31,12 +51,40 @@ class Config:
         self.max_search_results_per_query = int(
             os.getenv("MAX_SEARCH_RESULTS_PER_QUERY", 10)
         )
+        self.search_timeout = float(os.getenv("SEARCH_TIMEOUT", 20))
+        self.search_retries = int(os.getenv("SEARCH_RETRIES", 2))
+        self.search_cache_enabled = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+        self.search_cache_disk = os.getenv("SEARCH_CACHE_DISK", "true").lower() == "true"
+        self.search_cache_max_entries = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 2048))
         self.memory_backend = os.getenv("MEMORY_BACKEND", "local")
+        self.embedding_cache_enabled = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+        self.embedding_cache_disk = os.getenv("EMBEDDING_CACHE_DISK", "true").lower() == "true"
+        self.embedding_cache_max_entries = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 4096))
+        self.embedding_cache_disk_max_entries = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", 50_000))
+        self.embedding_cache_disk_ttl = int(os.getenv("EMBEDDING_CACHE_DISK_TTL", 30 * 24 * 60 * 60))
+        self.embedding_batch_max_items = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", 512))
+        self.embedding_batch_max_tokens = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", 100_000))
+        self.embedding_max_concurrency = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", 4))
+        self.context_prefilter_top_m = int(os.getenv("CONTEXT_PREFILTER_TOP_M", 0))
         self.total_words = int(os.getenv("TOTAL_WORDS", 10))
         self.report_format = os.getenv("REPORT_FORMAT", "apa")
         self.max_iterations = int(os.getenv("MAX_ITERATIONS", 5))
         self.agent_role = os.getenv("AGENT_ROLE", None)
         self.scraper = os.getenv("SCRAPER", "bs")
+        self.scraper_max_connections = int(os.getenv("SCRAPER_MAX_CONNECTIONS", 20))
+        self.scraper_max_connections_per_host = int(os.getenv("SCRAPER_MAX_CONNECTIONS_PER_HOST", 4))
+        self.scraper_timeout = float(os.getenv("SCRAPER_TIMEOUT", 10))
+        self.scraper_max_bytes = int(os.getenv("SCRAPER_MAX_BYTES", 10 * 1024 * 1024))
+        self.scrape_deadline = float(os.getenv("SCRAPE_DEADLINE", 20))
+        self.scrape_hedge_factor = float(os.getenv("SCRAPE_HEDGE_FACTOR", 1.5))
+        self.scraper_parse_workers = int(os.getenv("SCRAPER_PARSE_WORKERS", 0))
+        self.cache_dir = os.getenv("CACHE_DIR", ".cache")
+        self.scrape_cache_enabled = os.getenv("SCRAPE_CACHE_ENABLED", "true").lower() == "true"
+        self.host_failure_threshold = int(os.getenv("HOST_FAILURE_THRESHOLD", 3))
+        self.host_cool_down = int(os.getenv("HOST_COOL_DOWN", 15 * 60))
+        self.recent_url_filter_enabled = os.getenv("RECENT_URL_FILTER_ENABLED", "true").lower() == "true"
+        self.recent_url_window = int(os.getenv("RECENT_URL_WINDOW", 15 * 24 * 60 * 60))
+        self.recent_url_capacity = int(os.getenv("RECENT_URL_CAPACITY", 1_000_000))
         self.max_subtopics = os.getenv("MAX_SUBTOPICS", 3)
 
         self.load_config_file()
@@ -1,4 +1,9 @@
 from .compression import ContextCompressor
 from .retriever import SearchAPIRetriever
+from .dedup import NearDuplicateFilter
+from .bm25 import BM25Index
+from .index import RunIndex
+from .packer import ContextPacker
+from .splitter import StreamingTextSplitter
 
-__all__ = ['ContextCompressor', 'SearchAPIRetriever']
+__all__ = ['ContextCompressor', 'SearchAPIRetriever', 'NearDuplicateFilter', 'BM25Index', 'RunIndex', 'ContextPacker', 'StreamingTextSplitter']
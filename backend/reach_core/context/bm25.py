@@ -0,0 +1,82 @@
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+_TERM = re.compile(r"\w+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the this to was were what "
+    "when where which who why will with".split()
+)
+
+
+def tokenize(text):
+    return [term for term in _TERM.findall(text.lower()) if term not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incremental in-memory Okapi BM25 index over chunks, addressed by row number.
+    Used as a cheap lexical prefilter so only the most promising chunks are embedded.
+    """
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = {}
+        self.lengths = []
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def add(self, texts):
+        """Indexes the texts as the next rows"""
+        for text in texts:
+            row = len(self.lengths)
+            terms = tokenize(text)
+            for term, frequency in Counter(terms).items():
+                self.postings.setdefault(term, ([], []))
+                self.postings[term][0].append(row)
+                self.postings[term][1].append(frequency)
+            self.lengths.append(len(terms))
+            self.total_length += len(terms)
+
+    def scores(self, query):
+        """
+        Scores every row against the query
+        Returns:
+            float32 array with one score per row
+        """
+        count = len(self.lengths)
+        scores = np.zeros(count, dtype=np.float32)
+        if not count:
+            return scores
+        lengths = np.asarray(self.lengths, dtype=np.float32)
+        norms = self.k1 * (1 - self.b + self.b * lengths / max(self.total_length / count, 1))
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            rows = np.asarray(posting[0], dtype=np.int64)
+            frequencies = np.asarray(posting[1], dtype=np.float32)
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += idf * frequencies * (self.k1 + 1) / (frequencies + norms[rows])
+        return scores
+
+    def top(self, query, rows, m):
+        """
+        Keeps the m rows scoring highest against the query
+        Args:
+            query: query text
+            rows: candidate rows, int array
+            m: number of rows kept
+        Returns:
+            int array of at most m rows, in their original order
+        """
+        if len(rows) <= m:
+            return rows
+        scores = self.scores(query)[rows]
+        best = np.argpartition(-scores, m - 1)[:m]
+        return rows[np.sort(best)]
@@ -1,36 +1,21 @@
-from .retriever import SearchAPIRetriever
-from langchain.retrievers import (
-    ContextualCompressionRetriever,
-)
-from langchain.retrievers.document_compressors import (
-    DocumentCompressorPipeline,
-    EmbeddingsFilter,
-)
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from .index import RunIndex
 
 
 class ContextCompressor:
-    def __init__(self, documents, embeddings, max_results=5, **kwargs):
+    def __init__(self, documents, embeddings, max_results=5, index=None, **kwargs):
+        """
+        Args:
+            documents: scraped pages, dicts with 'url', 'raw_content' and optionally 'title'
+            embeddings: LangChain embeddings
+            index: RunIndex shared by the research run (optional). The pages are added to it,
+                so chunks already embedded earlier in the run are not embedded again.
+        """
         self.max_results = max_results
         self.documents = documents
         self.kwargs = kwargs
         self.embeddings = embeddings
         self.similarity_threshold = 0.30
-
-    def _get_contextual_retriever(self):
-        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-        relevance_filter = EmbeddingsFilter(embeddings=self.embeddings,
-                                             similarity_threshold=self.similarity_threshold)
-        pipeline_compressor = DocumentCompressorPipeline(
-            transformers=[splitter, relevance_filter]
-        )
-        base_retriever = SearchAPIRetriever(
-            pages=self.documents
-        )
-        contextual_retriever = ContextualCompressionRetriever(
-            base_compressor=pipeline_compressor, base_retriever=base_retriever
-        )
-        return contextual_retriever
+        self.index = index if index is not None else RunIndex(embeddings, similarity_threshold=self.similarity_threshold)
 
     def _pretty_print_docs(self, docs, top_n):
         formatted_string = []
@@ -57,6 +42,18 @@ class ContextCompressor:
         return formatted_string, docs_list
 
     def get_context(self, query, max_results=5):
-        compressed_docs = self._get_contextual_retriever()
-        relevant_docs = compressed_docs.get_relevant_documents(query)
+        self.index.add(self.documents)
+        # Only the given documents are searched, not everything indexed earlier in the run
+        urls = [document.get("url", "") for document in self.documents]
+        relevant_docs = self.index.search(query, k=max_results, urls=urls)
+        return self._pretty_print_docs(relevant_docs, max_results)
+
+    async def aget_context(self, query, max_results=5):
+        """
+        Same as get_context() without blocking the event loop: splitting runs in a worker thread
+        and the embedding calls are awaited, so several sub-queries can be compressed concurrently
+        """
+        await self.index.aadd(self.documents)
+        urls = [document.get("url", "") for document in self.documents]
+        relevant_docs = await self.index.asearch(query, k=max_results, urls=urls)
         return self._pretty_print_docs(relevant_docs, max_results)
\ No newline at end of file
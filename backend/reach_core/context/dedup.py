@@ -0,0 +1,116 @@
+import hashlib
+import re
+
+import numpy as np
+
+from reach_core.utils.tokens import count_tokens
+
+_WORD = re.compile(r"\w+")
+
+# A 64 bit fingerprint split into 4 bands of 16 bits: two fingerprints within
+# hamming distance 3 always share at least one band, so only those are compared.
+_BANDS = 4
+_BAND_BITS = 16
+
+
+def simhash(text, shingle_size=3):
+    """
+    Computes the 64 bit SimHash of the text over word shingles
+    Args:
+        text: text to fingerprint
+        shingle_size: number of consecutive words per feature
+    Returns:
+        fingerprint: int, or None if the text has no words
+    """
+    words = _WORD.findall(text.lower())
+    if not words:
+        return None
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+class FingerprintIndex:
+    """Set of SimHash fingerprints with banded lookup of near neighbours"""
+    def __init__(self, max_distance=3):
+        self.max_distance = max_distance
+        self._bands = [{} for _ in range(_BANDS)]
+
+    def _band_keys(self, fingerprint):
+        mask = (1 << _BAND_BITS) - 1
+        return [(fingerprint >> (band * _BAND_BITS)) & mask for band in range(_BANDS)]
+
+    def find(self, fingerprint):
+        """Returns True if a fingerprint within max_distance was added before"""
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, ()):
+                if (candidate ^ fingerprint).bit_count() <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, fingerprint):
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            band.setdefault(key, []).append(fingerprint)
+
+
+class NearDuplicateFilter:
+    """
+    Drops near-duplicate pages and paragraphs across a research run before they are embedded.
+    Syndicated wire copies come back from many sub-queries; only the first copy is kept.
+    """
+    def __init__(self, max_distance=3, min_paragraph_chars=80, model=None):
+        """
+        Args:
+            max_distance: maximum hamming distance between two fingerprints considered duplicates
+            min_paragraph_chars: shorter lines are never dropped as duplicate paragraphs
+            model: model whose tokenizer is used to report the embedding tokens saved
+        """
+        self.min_paragraph_chars = min_paragraph_chars
+        self.model = model
+        self.pages = FingerprintIndex(max_distance)
+        self.paragraphs = FingerprintIndex(max_distance)
+        self.stats = {"pages_dropped": 0, "paragraphs_dropped": 0, "tokens_saved": 0}
+
+    def filter(self, pages):
+        """
+        Filters scraped pages against everything seen earlier in the run
+        Args:
+            pages: list of dicts with 'url' and 'raw_content'
+        Returns:
+            pages: the pages that are not near duplicates, with duplicate paragraphs removed
+        """
+        kept = []
+        for page in pages:
+            content = page.get("raw_content") or ""
+            fingerprint = simhash(content)
+            if fingerprint is None:
+                continue
+            if self.pages.find(fingerprint):
+                self.stats["pages_dropped"] += 1
+                self.stats["tokens_saved"] += count_tokens(content, self.model)
+                print(f"Dropping near-duplicate page {page.get('url')}")
+                continue
+            self.pages.add(fingerprint)
+
+            lines = []
+            for line in content.split("\n"):
+                if len(line) >= self.min_paragraph_chars:
+                    line_fingerprint = simhash(line)
+                    if line_fingerprint is not None and self.paragraphs.find(line_fingerprint):
+                        self.stats["paragraphs_dropped"] += 1
+                        self.stats["tokens_saved"] += count_tokens(line, self.model)
+                        continue
+                    if line_fingerprint is not None:
+                        self.paragraphs.add(line_fingerprint)
+                lines.append(line)
+
+            if len(lines) != content.count("\n") + 1:
+                page = {**page, "raw_content": "\n".join(lines)}
+            kept.append(page)
+        return kept
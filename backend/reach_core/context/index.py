@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+
+import numpy as np
+from langchain.schema import Document
+
+from .bm25 import BM25Index
+from .splitter import StreamingTextSplitter
+
+
+class RunIndex:
+    """
+    In-memory vector index of everything gathered during a research run.
+    Pages are chunked and embedded once into a NumPy matrix of normalized vectors;
+    every sub-query is then answered with a single matrix-vector product.
+    With a prefilter, chunks are only indexed lexically when added and are embedded lazily,
+    when BM25 ranks them among the top candidates of a query.
+    """
+    def __init__(self, embeddings, chunk_size=1000, chunk_overlap=100, similarity_threshold=0.30,
+                 prefilter_top_m=0):
+        """
+        Args:
+            embeddings: LangChain embeddings used for chunks and queries
+            chunk_size: characters per chunk
+            chunk_overlap: characters shared by consecutive chunks
+            similarity_threshold: minimum cosine similarity of a chunk returned by search()
+            prefilter_top_m: if set, only the top M chunks by BM25 are embedded and scored per query
+        """
+        self.embeddings = embeddings
+        self.splitter = StreamingTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.similarity_threshold = similarity_threshold
+        self.prefilter_top_m = prefilter_top_m
+        self.bm25 = BM25Index() if prefilter_top_m else None
+        self.chunks = []
+        self.sources = []
+        self.titles = []
+        self._vectors = None
+        self._embedded = np.zeros(0, dtype=bool)
+        self._pages = set()
+        self._chunk_keys = set()
+        self._url_rows = {}
+        self._adding = {}
+
+    def __len__(self):
+        return len(self.chunks)
+
+    @property
+    def urls(self):
+        """Urls of the pages indexed so far, in the order they were added"""
+        return [url for url in self._url_rows if url]
+
+    @staticmethod
+    def _digest(*parts):
+        return hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=16).digest()
+
+    def _split(self, pages):
+        # Pure CPU work with no shared state, so it can run in a worker thread
+        split, page_keys = [], []
+        for page in pages:
+            url = page.get("url", "")
+            content = page.get("raw_content") or ""
+            page_key = self._digest(url, content)
+            page_keys.append(page_key)
+            if content and page_key not in self._pages:
+                split.append((page_key, url, page.get("title", ""), self.splitter.split_text(content)))
+        return split, page_keys
+
+    def _register(self, split):
+        chunks, sources, titles, keys = [], [], [], []
+        for page_key, url, title, page_chunks in split:
+            if page_key in self._pages:
+                continue
+            self._pages.add(page_key)
+            keys.append(page_key)
+            for chunk in page_chunks:
+                chunk_key = self._digest(url, chunk)
+                if chunk_key in self._chunk_keys:
+                    continue
+                self._chunk_keys.add(chunk_key)
+                keys.append(chunk_key)
+                chunks.append(chunk)
+                sources.append(url)
+                titles.append(title)
+        return chunks, sources, titles, keys
+
+    def _forget(self, keys):
+        # Pages whose embedding failed are indexed again by the next add
+        self._pages.difference_update(keys)
+        self._chunk_keys.difference_update(keys)
+
+    def _append(self, chunks, sources, titles, vectors=None):
+        start = len(self.chunks)
+        for row, url in enumerate(sources, start):
+            self._url_rows.setdefault(url, []).append(row)
+        self.chunks.extend(chunks)
+        self.sources.extend(sources)
+        self.titles.extend(titles)
+        self._embedded = np.concatenate([self._embedded, np.zeros(len(chunks), dtype=bool)])
+        if self.bm25 is not None:
+            self.bm25.add(chunks)
+        if vectors is not None:
+            self._store(np.arange(start, start + len(chunks)), vectors)
+        return len(chunks)
+
+    def _store(self, rows, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        self._grow(len(self.chunks), vectors.shape[1])
+        self._vectors[rows] = vectors
+        self._embedded[rows] = True
+
+    def add(self, pages):
+        """
+        Chunks and embeds the pages not indexed yet
+        Args:
+            pages: list of dicts with 'url', 'raw_content' and optionally 'title'
+        Returns:
+            number of chunks added
+        """
+        chunks, sources, titles, keys = self._register(self._split(pages)[0])
+        if not chunks:
+            return 0
+        if self.bm25 is not None:
+            return self._append(chunks, sources, titles)
+        try:
+            vectors = self.embeddings.embed_documents(chunks)
+        except Exception:
+            self._forget(keys)
+            raise
+        return self._append(chunks, sources, titles, vectors)
+
+    async def aadd(self, pages):
+        """
+        Same as add() without blocking the event loop: pages are split in a worker thread and
+        embedded through the async embeddings API. Returns once the pages are searchable, also
+        when a concurrent call is still embedding some of them.
+        """
+        split, all_page_keys = await asyncio.to_thread(self._split, pages)
+        waiting = {self._adding[key] for key in all_page_keys if key in self._adding}
+        chunks, sources, titles, keys = self._register(split)
+        added = 0
+        if chunks and self.bm25 is not None:
+            added = self._append(chunks, sources, titles)
+        elif chunks:
+            done = asyncio.get_running_loop().create_future()
+            registered = set(keys)
+            page_keys = [key for key, *_ in split if key in registered]
+            for key in page_keys:
+                self._adding[key] = done
+            try:
+                vectors = await self.embeddings.aembed_documents(chunks)
+                added = self._append(chunks, sources, titles, vectors)
+            except BaseException:
+                self._forget(keys)
+                raise
+            finally:
+                for key in page_keys:
+                    self._adding.pop(key, None)
+                done.set_result(None)
+        if waiting:
+            await asyncio.gather(*waiting)
+        return added
+
+    def _grow(self, rows, dimensions):
+        # Capacity doubles so adding pages one sub-query at a time stays amortized O(n)
+        if self._vectors is None:
+            self._vectors = np.empty((max(rows, 256), dimensions), dtype=np.float32)
+        elif rows > len(self._vectors):
+            vectors = np.empty((max(rows, 2 * len(self._vectors)), dimensions), dtype=np.float32)
+            vectors[:len(self._vectors)] = self._vectors
+            self._vectors = vectors
+
+    def search(self, query, k=8, urls=None):
+        """
+        Finds the chunks most similar to the query
+        Args:
+            query: query text
+            k: maximum number of chunks returned
+            urls: only chunks of these urls are considered (optional)
+        Returns:
+            list of Documents with 'source' and 'title' metadata, most similar first
+        """
+        rows = self._candidates(query, urls)
+        if rows is None:
+            return []
+        pending = rows[~self._embedded[rows]]
+        if len(pending):
+            self._store(pending, self.embeddings.embed_documents([self.chunks[row] for row in pending]))
+        return self._top_k(self.embeddings.embed_query(query), rows, k)
+
+    async def asearch(self, query, k=8, urls=None):
+        """Same as search(), embedding the query through the async embeddings API"""
+        rows = self._candidates(query, urls)
+        if rows is None:
+            return []
+        pending = rows[~self._embedded[rows]]
+        if len(pending):
+            vectors = await self.embeddings.aembed_documents([self.chunks[row] for row in pending])
+            self._store(pending, vectors)
+        return self._top_k(await self.embeddings.aembed_query(query), rows, k)
+
+    def _candidates(self, query, urls):
+        rows = self._rows(urls)
+        if rows is not None and self.bm25 is not None:
+            # Only the lexically closest chunks are embedded and scored
+            rows = self.bm25.top(query, rows, self.prefilter_top_m)
+        return rows
+
+    def _rows(self, urls):
+        if not self.chunks:
+            return None
+        if urls is None:
+            return np.arange(len(self.chunks))
+        rows = np.fromiter(
+            (row for url in dict.fromkeys(urls) for row in self._url_rows.get(url, ())), dtype=np.int64
+        )
+        return rows if len(rows) else None
+
+    def _top_k(self, query_vector, rows, k):
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        if norm:
+            query_vector /= norm
+        scores = self._vectors[rows] @ query_vector
+
+        passing = np.flatnonzero(scores >= self.similarity_threshold)
+        if len(passing) > k:
+            passing = passing[np.argpartition(-scores[passing], k - 1)[:k]]
+        passing = passing[np.argsort(-scores[passing], kind="stable")]
+
+        return [
+            Document(
+                page_content=self.chunks[row],
+                metadata={"source": self.sources[row], "title": self.titles[row], "score": float(scores[i])},
+            )
+            for i, row in zip(passing, rows[passing])
+        ]
@@ -0,0 +1,87 @@
+import re
+
+from reach_core.utils.tokens import count_tokens
+
+from .dedup import FingerprintIndex, simhash
+
+# Blocks written by ContextCompressor._pretty_print_docs start with a Source and a Title line
+_BLOCK_START = re.compile(r"\n(?=Source: [^\n]*\nTitle: )")
+
+
+def split_blocks(item):
+    """
+    Splits one context item (the formatted result of a sub-query) into its chunk blocks
+    Args:
+        item: formatted string, or the (string, docs) pair returned by ContextCompressor
+    Returns:
+        list of block strings, most relevant first
+    """
+    if isinstance(item, (tuple, list)):
+        item = item[0] if item else ""
+    return [block for block in _BLOCK_START.split(str(item)) if block.strip()]
+
+
+class ContextPacker:
+    """
+    Fits the research context into a token budget before it is pasted into a report prompt.
+    Duplicate chunks are dropped, then blocks are taken round-robin across sub-queries in
+    relevance order until the budget is full. What was dropped, and why, is kept in self.dropped.
+    """
+    def __init__(self, budget=25_000, model=None, max_distance=3):
+        """
+        Args:
+            budget: maximum tokens of context, counted with the model's tokenizer
+            model: model the prompt is sent to
+            max_distance: SimHash hamming distance under which two blocks count as duplicates
+        """
+        self.budget = budget
+        self.model = model
+        self.max_distance = max_distance
+        self.dropped = []
+        self.stats = {"blocks": 0, "kept": 0, "duplicates": 0, "over_budget": 0, "tokens": 0, "tokens_dropped": 0}
+
+    @staticmethod
+    def _source(block):
+        first_line = block.split("\n", 1)[0]
+        return first_line[len("Source: "):] if first_line.startswith("Source: ") else ""
+
+    def pack(self, context):
+        """
+        Args:
+            context: list of context items, one per sub-query
+        Returns:
+            list of strings, one per sub-query that kept at least one block, in the original order
+        """
+        groups = [split_blocks(item) for item in context]
+        kept = [[] for _ in groups]
+        seen = FingerprintIndex(self.max_distance)
+        used = 0
+
+        depth = max((len(blocks) for blocks in groups), default=0)
+        for rank in range(depth):
+            for group, blocks in enumerate(groups):
+                if rank >= len(blocks):
+                    continue
+                block = blocks[rank]
+                self.stats["blocks"] += 1
+                tokens = count_tokens(block, self.model)
+                fingerprint = simhash(block)
+                if fingerprint is not None and seen.find(fingerprint):
+                    self._drop(block, tokens, "duplicate")
+                    continue
+                if used + tokens > self.budget:
+                    self._drop(block, tokens, "over_budget")
+                    continue
+                if fingerprint is not None:
+                    seen.add(fingerprint)
+                kept[group].append(block)
+                used += tokens
+
+        self.stats["kept"] = self.stats["blocks"] - self.stats["duplicates"] - self.stats["over_budget"]
+        self.stats["tokens"] = used
+        return ["\n".join(blocks) for blocks in kept if blocks]
+
+    def _drop(self, block, tokens, reason):
+        self.stats["duplicates" if reason == "duplicate" else "over_budget"] += 1
+        self.stats["tokens_dropped"] += tokens
+        self.dropped.append({"source": self._source(block), "tokens": tokens, "reason": reason})
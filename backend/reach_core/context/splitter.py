@@ -0,0 +1,109 @@
+from typing import NamedTuple
+
+_WHITESPACE = " \t\n\r\f\v"
+
+
+class Span(NamedTuple):
+    """A chunk as offsets into the source text"""
+    start: int
+    end: int
+
+    def text(self, source):
+        return source[self.start:self.end]
+
+
+class StreamingTextSplitter:
+    """
+    Single pass replacement for LangChain's RecursiveCharacterTextSplitter.
+    Follows the same boundary rules: split on the coarsest separator present, merge the pieces up
+    to chunk_size, carry trailing pieces of at most chunk_overlap characters into the next chunk,
+    and only go down to a finer separator inside pieces that are too long on their own.
+    Instead of recursively splitting and joining strings, it walks the text once with str.find,
+    and chunks are yielded lazily as offsets that are only sliced out when their text is needed.
+    """
+    def __init__(self, chunk_size=1000, chunk_overlap=100, separators=("\n\n", "\n", " ")):
+        """
+        Args:
+            chunk_size: maximum characters per chunk
+            chunk_overlap: maximum characters shared by consecutive chunks
+            separators: separators to break on, coarsest first; text without any of them is cut hard
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators
+
+    def _level(self, text, start, pieces, present):
+        """
+        Finds the separator whose pieces are merged at start, and the enclosing piece they belong to.
+        pieces and present memoize lookups, so long pieces are not scanned again for every chunk.
+        """
+        enclosing = (0, len(text))
+        for level, separator in enumerate(self.separators):
+            key = (level, enclosing)
+            if key not in present:
+                present[key] = text.find(separator, *enclosing) != -1
+            if not present[key]:
+                continue
+
+            cached = pieces.get(level)
+            if cached and cached[0] == enclosing and cached[1] <= start < cached[2]:
+                begin, end = cached[1], cached[2]
+            else:
+                begin = text.rfind(separator, enclosing[0], start + len(separator))
+                begin = enclosing[0] if begin == -1 else begin
+                end = text.find(separator, max(begin, start) + 1, enclosing[1])
+                end = enclosing[1] if end == -1 else end
+                pieces[level] = (enclosing, begin, end)
+
+            if end - begin < self.chunk_size:
+                return separator, enclosing
+            enclosing = (begin, end)
+        return "", enclosing
+
+    def iter_spans(self, text):
+        """
+        Yields the chunks of the text as Spans, with surrounding whitespace excluded
+        """
+        length = len(text)
+        pieces, present = {}, {}
+        start = 0
+        while start < length:
+            separator, (_, enclosing_end) = self._level(text, start, pieces, present)
+            limit = min(start + self.chunk_size, enclosing_end)
+            if limit == enclosing_end or not separator:
+                cut = limit
+            else:
+                cut = text.rfind(separator, start + 1, limit + len(separator))
+                cut = limit if cut == -1 else cut
+
+            chunk_start, chunk_end = start, cut
+            while chunk_start < chunk_end and text[chunk_start] in _WHITESPACE:
+                chunk_start += 1
+            while chunk_end > chunk_start and text[chunk_end - 1] in _WHITESPACE:
+                chunk_end -= 1
+            if chunk_end > chunk_start:
+                yield Span(chunk_start, chunk_end)
+
+            if cut >= length or cut == enclosing_end:
+                # Chunks never overlap across the end of an enclosing piece
+                start = cut
+            elif not separator:
+                start = max(start + 1, cut - self.chunk_overlap)
+            else:
+                # Keep the trailing pieces that fit in the overlap, as long as the next piece still fits
+                next_end = text.find(separator, cut + len(separator), enclosing_end)
+                next_end = enclosing_end if next_end == -1 else next_end
+                overlap = text.find(separator, max(start + 1, cut - self.chunk_overlap), cut)
+                while overlap != -1 and next_end - overlap > self.chunk_size:
+                    overlap = text.find(separator, overlap + 1, cut)
+                start = cut if overlap == -1 else overlap
+
+    def iter_chunks(self, text):
+        """Yields the chunk texts one at a time"""
+        for span in self.iter_spans(text):
+            yield text[span.start:span.end]
+
+    def split_text(self, text):
+        return list(self.iter_chunks(text))
@@ -1,52 +1,155 @@
+import json
 import os
+
 import httpx
 from colorama import Fore, Style
 
+from reach_core.utils.clients import LoopBoundClients
+
+from ..messages import chat_messages
+
+
+def _chatml(messages):
+    prompt = "".join(f"<|im_start|>{m['role']}\n{m['content']}<|im_end|>\n" for m in messages)
+    return prompt + "<|im_start|>assistant\n"
+
+
+def _llama3(messages):
+    prompt = "".join(
+        f"<|start_header_id|>{m['role']}<|end_header_id|>\n\n{m['content']}<|eot_id|>" for m in messages
+    )
+    return prompt + "<|start_header_id|>assistant<|end_header_id|>\n\n"
+
+
+def _mistral(messages):
+    # Mistral has no system role: the system prompt opens the first instruction
+    system = "\n\n".join(m["content"] for m in messages if m["role"] == "system")
+    if not any(m["role"] == "user" for m in messages):
+        # Without a user turn the system prompt is the instruction
+        return f"[INST] {system} [/INST]" if system else ""
+    prompt = ""
+    for m in messages:
+        if m["role"] == "user":
+            content = f"{system}\n\n{m['content']}" if system and not prompt else m["content"]
+            prompt += f"[INST] {content} [/INST]"
+        elif m["role"] == "assistant":
+            prompt += f" {m['content']}</s>"
+    return prompt
+
+
+# Chat template name -> (prompt formatter, stop strings)
+CHAT_TEMPLATES = {
+    "chatml": (_chatml, ["<|im_end|>"]),
+    "llama3": (_llama3, ["<|eot_id|>"]),
+    "mistral": (_mistral, ["</s>"]),
+}
+
+
+def apply_chat_template(messages, template="chatml"):
+    """
+    Formats chat messages into a single prompt for the llama.cpp /completion endpoint
+    Returns:
+        (prompt, stop strings)
+    """
+    if template not in CHAT_TEMPLATES:
+        raise ValueError(f"Unknown chat template {template}, expected one of {', '.join(CHAT_TEMPLATES)}")
+    format_prompt, stop = CHAT_TEMPLATES[template]
+    return format_prompt(chat_messages(messages)), stop
+
+
+_clients = LoopBoundClients()
+
+
+def get_llama_cpp_client(base_url, max_connections=8, timeout=600):
+    """
+    Gets the process-wide HTTP client of a llama.cpp server, bound to the running event loop
+    Args:
+        base_url: llama.cpp server url
+        max_connections: requests in flight at once
+        timeout: seconds allowed for a whole generation
+    """
+    return _clients.get(base_url, lambda: httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(timeout, connect=10),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    ))
+
+
 class CplusplusProvider:
+    """
+    Chat models served by a llama.cpp server, called through its /completion endpoint on a pooled async client.
+    Prompts are formatted with the chat template of the model (LLAMA_CPP_CHAT_TEMPLATE) and sent with
+    cache_prompt and no slot (id_slot -1): the server hands each call to the idle slot whose cached prompt
+    is most similar, so a shared system prompt is reused from a slot's KV cache when one is free, while
+    concurrent calls with the same prompt still run in parallel on different slots.
+    """
     def __init__(self, model, temperature, max_tokens):
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.base_url = os.getenv("LLAMA_CPP_BASE_URL", "http://inference-server:11434").rstrip("/")
+        self.template = os.getenv("LLAMA_CPP_CHAT_TEMPLATE", "chatml")
+        self.max_connections = int(os.getenv("LLAMA_CPP_MAX_CONNECTIONS", 8))
+
+    @property
+    def client(self):
+        return get_llama_cpp_client(self.base_url, self.max_connections)
+
+    def _payload(self, messages, stream):
+        prompt, stop = apply_chat_template(messages, self.template)
+        return {
+            "prompt": prompt,
+            "stop": stop,
+            "temperature": self.temperature,
+            "n_predict": self.max_tokens if self.max_tokens is not None else -1,
+            "stream": stream,
+            "cache_prompt": True,
+            "id_slot": -1,
+        }
 
     async def get_chat_response(self, messages, stream, websocket=None):
         if not stream:
-            response = await self.send_request(messages)
-            print(response)
-            return response
+            return await self.send_request(messages)
         else:
             return await self.stream_response(messages, websocket)
 
     async def send_request(self, messages):
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url="http://inference-server:11434/completion",
-                headers={"Content-Type": "application/json"},
-                json={"prompt": messages, "n_predict": self.max_tokens}
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self.client.post("/completion", json=self._payload(messages, False))
+        response.raise_for_status()
+        return response.json()["content"]
 
     async def stream_response(self, messages, websocket=None):
         paragraph = ""
         response = ""
 
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST",
-                url="http://inference-server:11434/completion",
-                headers={"Content-Type": "application/json"},
-                json={"prompt": messages, "n_predict": self.max_tokens}
-            ) as stream_response:
-                async for chunk in stream_response.aiter_text():
-                    if chunk:
-                        response += chunk
-                        paragraph += chunk
-                        if "\n" in paragraph:
-                            if websocket:
-                                await websocket.send_json({"type": "report", "output": paragraph})
-                            else:
-                                print(f"{Fore.GREEN}{paragraph}{Style.RESET_ALL}")
-                            paragraph = ""
-                        print(chunk)
-
-        return response
\ No newline at end of file
+        # The server sends Server-Sent Events, one "data: {json}" line per generated piece
+        async with self.client.stream("POST", "/completion", json=self._payload(messages, True)) as stream:
+            stream.raise_for_status()
+            async for line in stream.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise RuntimeError(f"llama.cpp error: {chunk['error']}")
+                content = chunk.get("content", "")
+                if content:
+                    response += content
+                    paragraph += content
+                    if "\n" in paragraph:
+                        if websocket is not None:
+                            await websocket.send_json({"type": "report", "output": paragraph})
+                        else:
+                            print(f"{Fore.GREEN}{paragraph}{Style.RESET_ALL}")
+                        paragraph = ""
+                if chunk.get("stop"):
+                    break
+
+        if paragraph:
+            if websocket is not None:
+                await websocket.send_json({"type": "report", "output": paragraph})
+            else:
+                print(f"{Fore.GREEN}{paragraph}{Style.RESET_ALL}")
+        return response
@@ -0,0 +1,19 @@
+def chat_messages(messages):
+    """
+    Converts messages to the role/content dicts of a chat API
+    Args:
+        messages: list of {"role", "content"} dicts, (role, content) pairs or LangChain messages, or a string
+    """
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    roles = {"human": "user", "ai": "assistant"}
+    converted = []
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role", "user"), message.get("content", "")
+        elif isinstance(message, (tuple, list)):
+            role, content = message
+        else:
+            role, content = getattr(message, "type", "user"), getattr(message, "content", str(message))
+        converted.append({"role": roles.get(role, role), "content": str(content)})
+    return converted
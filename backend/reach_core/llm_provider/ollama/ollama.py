@@ -1,11 +1,36 @@
+import json
 import os
 
-from litellm import completion
+import httpx
 from colorama import Fore, Style
 
+from reach_core.utils.clients import LoopBoundClients
+
+from ..messages import chat_messages
+
+_clients = LoopBoundClients()
+
+
+def get_ollama_client(base_url, max_connections=8, timeout=600):
+    """
+    Gets the process-wide HTTP client of an Ollama server, bound to the running event loop
+    Args:
+        base_url: Ollama server url
+        max_connections: requests in flight at once
+        timeout: seconds allowed for a whole generation
+    """
+    return _clients.get(base_url, lambda: httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(timeout, connect=10),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    ))
 
-class OllamaProvider:
 
+class OllamaProvider:
+    """
+    Chat models served by Ollama, called through its /api/chat endpoint on a pooled async client.
+    The server url is read from OLLAMA_BASE_URL.
+    """
     def __init__(
         self,
         model,
@@ -15,18 +40,27 @@ class OllamaProvider:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.base_url = os.getenv("OLLAMA_BASE_URL", "http://ollama:11434").rstrip("/")
+        self.max_connections = int(os.getenv("OLLAMA_MAX_CONNECTIONS", 8))
+
+    @property
+    def client(self):
+        return get_ollama_client(self.base_url, self.max_connections)
 
-    async def get_chat_response(self, messages, stream, webocket=None):
+    def _payload(self, messages, stream):
+        options = {"temperature": self.temperature}
+        if self.max_tokens is not None:
+            options["num_predict"] = self.max_tokens
+        return {"model": self.model, "messages": chat_messages(messages), "stream": stream, "options": options}
+
+    async def get_chat_response(self, messages, stream, websocket=None):
         if not stream:
-            # Getting output from the model chain using ainvoke for asynchronous invoking
-            response = completion(
-                model=f"ollama_chat/{self.model}", 
-                messages=[{"content": f"{messages}", "role": "user"}], 
-                api_base="http://ollama:11434"
-            )
-            print(response)
-
-            return response
+            response = await self.client.post("/api/chat", json=self._payload(messages, False))
+            response.raise_for_status()
+            data = response.json()
+            if "error" in data:
+                raise RuntimeError(f"Ollama error: {data['error']}")
+            return data["message"]["content"]
         else:
             return await self.stream_response(messages, websocket)
 
@@ -34,22 +68,31 @@ class OllamaProvider:
         paragraph = ""
         response = ""
 
-        response = await litellm.acompletion(
-            model=f"ollama_chat/{self.mode}", 
-            messages=[{f"content": "{messages}" ,"role": "user"}], 
-            api_base="http://ollama:11434", 
-            stream=True
-        )
-        async for chunk in response:
-            if chunk is not None:
-                response += chunk
-                paragraph += chunk
-                if "\n" in paragraph:
-                    if websocket is not None:
-                        await websocket.send_json({"type": "report", "output": paragraph})
-                    else:
-                        print(f"{Fore.GREEN}{paragraph}{Style.RESET_ALL}")
-                    paragraph = ""
-                print(chunk)
-        
+        # Ollama streams one JSON object per line, each carrying the next tokens of the message
+        async with self.client.stream("POST", "/api/chat", json=self._payload(messages, True)) as stream:
+            stream.raise_for_status()
+            async for line in stream.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise RuntimeError(f"Ollama error: {chunk['error']}")
+                content = chunk.get("message", {}).get("content", "")
+                if content:
+                    response += content
+                    paragraph += content
+                    if "\n" in paragraph:
+                        if websocket is not None:
+                            await websocket.send_json({"type": "report", "output": paragraph})
+                        else:
+                            print(f"{Fore.GREEN}{paragraph}{Style.RESET_ALL}")
+                        paragraph = ""
+                if chunk.get("done"):
+                    break
+
+        if paragraph:
+            if websocket is not None:
+                await websocket.send_json({"type": "report", "output": paragraph})
+            else:
+                print(f"{Fore.GREEN}{paragraph}{Style.RESET_ALL}")
         return response
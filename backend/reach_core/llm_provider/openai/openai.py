@@ -32,12 +32,14 @@ class OpenAIProvider:
         return api_key
 
     def get_llm_model(self):
-        # Initializing the chat model
+        # Initializing the chat model. Calls are retried by the RetryPolicy in utils/llm.py, which
+        # honors Retry-After and the error budget, so the SDK must not retry on its own as well
         llm = ChatOpenAI(
             model=self.model,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
-            api_key=self.api_key
+            api_key=self.api_key,
+            max_retries=0
         )
 
         return llm
@@ -1,4 +1,6 @@
 import io
+import math
+import asyncio
 import requests
 import time
 import aiofiles
@@ -13,11 +15,13 @@ import img2pdf
 import docx2txt
 from urllib.parse import urlparse, unquote
 from typing import List, Dict
-from reach_core.config import Config
 from reach_core.master.functions import *
 from reach_core.context.compression import ContextCompressor
-from reach_core.memory import Memory
+from reach_core.context.dedup import NearDuplicateFilter
+from reach_core.context.index import RunIndex
+from reach_core.runtime import get_runtime
 from reach_core.utils.enum import ReportType
+from reach_core.utils.urls import VisitedURLIndex
 
 
 class Reach:
@@ -29,18 +33,21 @@ class Reach:
          query: str, 
          report_type: str=ReportType.ResearchReport.value,
          source_urls=None, 
-         sources=["WEB"],
+         sources=None,
          config_path=None, 
          websocket=None,
          cadence="",
          agent=None,
          role=None,
          parent_query="",
-         subtopics=[],
-         visited_urls=set(),
+         subtopics=None,
+         visited_urls=None,
          retained_text="",
          deleted_text="",
-         file_urls=[]
+         file_urls=None,
+         near_duplicates=None,
+         run_index=None,
+         runtime=None
      ):
         """
         Initialize the Reach class.
@@ -49,6 +56,10 @@ class Reach:
             report_type:
             config_path:
             websocket:
+            visited_urls: VisitedURLIndex of urls already used, shared with the other assistants of a detailed report (optional)
+            near_duplicates: NearDuplicateFilter shared by every assistant of the research run (optional)
+            run_index: RunIndex shared by every assistant of the research run (optional)
+            runtime: Runtime providing the config and the shared clients, defaults to the one of config_path
         """
         self.query = query
         self.agent = agent
@@ -56,16 +67,23 @@ class Reach:
         self.report_type = report_type
         self.websocket = websocket
         self.cadence = cadence
-        self.cfg = Config(config_path)
-        self.retriever = get_retriever(self.cfg.retriever)
+        self.runtime = runtime if runtime is not None else get_runtime(config_path)
+        self.cfg = self.runtime.cfg
+        self.retriever = self.runtime.retriever
         self.context = []
         self.source_urls = source_urls
-        self.sources = sources
-        self.memory = Memory(self.cfg.embedding_provider)
-        self.visited_urls = visited_urls
+        self.sources = sources if sources is not None else ["WEB"]
+        self.memory = self.runtime.memory()
+        # Digests of the urls claimed so far, so tracking parameters and AMP variants are not scraped twice
+        self.visited_urls = visited_urls if visited_urls is not None else VisitedURLIndex()
         self.retained_text = retained_text
         self.deleted_text = deleted_text
-        self.file_urls = file_urls
+        self.file_urls = file_urls if file_urls is not None else []
+        self.near_duplicates = near_duplicates if near_duplicates else NearDuplicateFilter()
+        # Every page gathered in the run is chunked and embedded once, then queried per sub-query
+        self.run_index = run_index if run_index is not None else RunIndex(
+            self.memory.get_embeddings(), prefilter_top_m=self.cfg.context_prefilter_top_m
+        )
 
         # Only relevant for DETAILED REPORTS
         # --------------------------------------
@@ -74,7 +92,7 @@ class Reach:
         self.parent_query = parent_query
 
         # Stores all the user provided subtopics
-        self.subtopics = subtopics
+        self.subtopics = subtopics if subtopics is not None else []
 
     async def conduct_research(self):
         """
@@ -100,7 +118,7 @@ class Reach:
         if self.source_urls:
             self.context += await self.get_context_by_urls(self.source_urls)
 
-        time.sleep(2)
+        await asyncio.sleep(2)
 
     async def write_report(self, existing_headers: list = []):
         """
@@ -155,7 +173,10 @@ class Reach:
         # await stream_output("logs",
         #                     f"I will conduct my research based on the following urls: {new_search_urls}...",
         #                     self.websocket)
-        scraped_sites = scrape_urls(new_search_urls, self.cfg)
+        # The user asked for these urls: scrape them even if their host's circuit is open
+        scraped_sites, unfinished = await ascrape_urls(new_search_urls, self.cfg, self.cadence, skip_unhealthy=False)
+        self.release_urls(unfinished)
+        scraped_sites = self.near_duplicates.filter(scraped_sites)
         web_results = await self.get_similar_content_by_query(self.query, scraped_sites)
 
         return web_results
@@ -279,7 +300,11 @@ class Reach:
             if sub_queries:
                 for sub_query in sub_queries:
                     await stream_output("logs", f"Processing sub-query: {sub_query}", self.websocket)
-                    document_content = await self.get_similar_content_by_query(sub_query, parsed_content)
+                # The files are embedded once, so every sub-query can be compressed concurrently
+                documents_content = await asyncio.gather(
+                    *(self.get_similar_content_by_query(sub_query, parsed_content) for sub_query in sub_queries)
+                )
+                for sub_query, document_content in zip(sub_queries, documents_content):
                     if document_content:
                         content.append(document_content)
                     else:
@@ -343,17 +368,24 @@ class Reach:
         content = []
         all_docs_dicts = []
 
-        # Run Sub-Queries
-        for sub_query in sub_queries:
-            scraped_sites = await self.scrape_sites_by_query(sub_query)
-            web_content, docs_dict = await self.get_similar_content_by_query(sub_query, scraped_sites)
+        # Search every sub-query concurrently, then scrape them one by one
+        search_results = await self.search_sub_queries(sub_queries)
+
+        # Run Sub-Queries: scraping stays sequential so later sub-queries skip urls already visited,
+        # while the pages of each sub-query are compressed in the background
+        compressions = []
+        for sub_query, results in zip(sub_queries, search_results):
+            scraped_sites = self.near_duplicates.filter(await self.scrape_sites_by_query(sub_query, results))
+            compressions.append(asyncio.create_task(self.get_similar_content_by_query(sub_query, scraped_sites)))
 
+        for web_content, docs_dict in await asyncio.gather(*compressions):
             if web_content:
                 content.append(web_content)
                 all_docs_dicts.extend(docs_dict)
             else:
                 pass
 
+        print(f"Near-duplicate filter: {self.near_duplicates.stats}")
         await stream_output("sources", all_docs_dicts, self.websocket)
 
         return content
@@ -366,32 +398,58 @@ class Reach:
 
         new_urls = []
         for url in url_set_input:
-            if url not in self.visited_urls:
+            if self.visited_urls.add(url):
                 # await stream_output("logs", f"Adding source url to research: {url}\n", self.websocket)
 
-                self.visited_urls.add(url)
                 new_urls.append(url)
 
         return new_urls
 
-    async def scrape_sites_by_query(self, sub_query):
+    def release_urls(self, urls):
+        """ Forgets urls that were claimed by get_new_urls but never scraped """
+        for url in urls:
+            self.visited_urls.discard(url)
+
+    def _search_results_per_query(self):
+        # Hedge: search for more results than needed and stop scraping once enough pages arrived
+        return math.ceil(self.cfg.max_search_results_per_query * self.cfg.scrape_hedge_factor)
+
+    async def search_sub_queries(self, sub_queries):
+        """
+        Searches all sub-queries concurrently
+        Args:
+        sub_queries: list of queries
+        Returns:
+        search_results: list of result lists, in the order of sub_queries
+        """
+        return await self.retriever.asearch_many(sub_queries, max_results=self._search_results_per_query(),
+                                                 cfg=self.cfg, cadence=self.cadence)
+
+    async def scrape_sites_by_query(self, sub_query, search_results=None):
         """
         Runs a sub-query
         Args:
         sub_query:
+        search_results: results already retrieved for the sub-query (optional)
         Returns:
         Summary
         """
         # Get Urls
         retriever = self.retriever(sub_query)
         try:
-            search_results = retriever.search(max_results=self.cfg.max_search_results_per_query)
+            max_results = self.cfg.max_search_results_per_query
+            if search_results is None:
+                search_results = await retriever.asearch(max_results=self._search_results_per_query(), cfg=self.cfg,
+                                                         cadence=self.cadence)
             new_search_urls = await self.get_new_urls([url.get("href") for url in search_results if url.get("href")])
             
             # Scrape Urls
             # await stream_output("logs", f"📝Scraping urls {new_search_urls}...\n", self.websocket)
             # await stream_output("logs", f"Researching for relevant information...\n", self.websocket)
-            scraped_content_results = scrape_urls(new_search_urls, self.cfg)
+            scraped_content_results, unfinished = await ascrape_urls(new_search_urls, self.cfg, self.cadence,
+                                                                     target=max_results)
+            # Urls that were cancelled were never used, so later sub-queries may still pick them up
+            self.release_urls(unfinished)
             return scraped_content_results
         except Exception as e:
             print(f"Error in scrape_sites_by_query for sub_query '{sub_query}': {str(e)}")
@@ -400,9 +458,10 @@ class Reach:
     async def get_similar_content_by_query(self, query, pages):
         # await stream_output("logs", f"Getting relevant content based on query: {query}...", self.websocket)
         # Summarize Raw Data
-        context_compressor = ContextCompressor(documents=pages, embeddings=self.memory.get_embeddings())
+        context_compressor = ContextCompressor(documents=pages, embeddings=self.memory.get_embeddings(),
+                                               index=self.run_index)
         # Run Tasks
-        return context_compressor.get_context(query, max_results=8)
+        return await context_compressor.aget_context(query, max_results=8)
     
 
     ########################################################################################
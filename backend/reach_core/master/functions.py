@@ -9,6 +9,11 @@ import markdown
 
 from reach_core.master.prompts import *
 from reach_core.scraper.scraper import Scraper
+from reach_core.scraper.engine import get_scrape_engine
+from reach_core.scraper.cache import get_scrape_cache
+from reach_core.scraper.parsing import get_parse_pool
+from reach_core.scraper.health import get_host_health
+from reach_core.context.packer import ContextPacker
 from reach_core.utils.llm import *
 
 
@@ -33,6 +38,17 @@ def get_retriever(retriever):
     return retriever
 
 
+def parse_agent(response):
+    """
+    Parses the agent chooser's answer
+    Returns:
+        agent: Agent name
+        agent_role_prompt: Agent role prompt
+    """
+    agent_dict = json.loads(response)
+    return agent_dict["server"], agent_dict["agent_role_prompt"]
+
+
 async def choose_agent(query, cfg):
     """
     Chooses the agent automatically
@@ -51,10 +67,10 @@ async def choose_agent(query, cfg):
                 {"role": "system", "content": f"{auto_agent_instructions()}"},
                 {"role": "user", "content": f"task: {query}"}],
             temperature=0,
-            llm_provider=cfg.llm_provider
+            llm_provider=cfg.llm_provider,
+            validate=parse_agent
         )
-        agent_dict = json.loads(response)
-        return agent_dict["server"], agent_dict["agent_role_prompt"]
+        return parse_agent(response)
     except Exception as e:
         return "Default Agent", "You are an AI critical thinker research assistant. Your sole purpose is to write well written, critically acclaimed, objective and structured reports on given text."
 
@@ -94,7 +110,8 @@ async def get_sub_queries(query: str, agent_role_prompt: str, cfg, parent_query:
             }
         ],
         temperature=0,
-        llm_provider=cfg.llm_provider
+        llm_provider=cfg.llm_provider,
+        validate=json.loads
     )
 
     sub_queries = json.loads(response)
@@ -124,6 +141,35 @@ def scrape_urls(urls, cfg=None):
     return content
 
 
+async def ascrape_urls(urls, cfg=None, cadence="", target=None, skip_unhealthy=True):
+    """
+    Scrapes the urls on the shared async scrape engine, bounded by cfg.scrape_deadline
+    Args:
+    urls: List of urls
+    cfg: Config (optional)
+    cadence: report cadence, decides how long cached pages stay fresh
+    target: stop once this many pages have content and cancel the rest (optional)
+    skip_unhealthy: skip hosts whose circuit is open, False for urls the user asked for
+    Returns:
+    content: List of scraped pages
+    unfinished: List of urls that were cancelled before they finished
+    """
+    content = []
+    unfinished = []
+    user_agent = cfg.user_agent if cfg else "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36 Edg/119.0.0.0"
+    try:
+        scraper = Scraper(urls, user_agent, cfg.scraper if cfg else "bs", engine=get_scrape_engine(cfg),
+                          cache=get_scrape_cache(cfg), cadence=cadence, parse_pool=get_parse_pool(cfg),
+                          host_health=get_host_health(cfg), skip_unhealthy=skip_unhealthy)
+        content = await scraper.arun(deadline=cfg.scrape_deadline if cfg else None, target=target)
+        unfinished = scraper.unfinished
+    except Exception as e:
+        print(f"Error in ascrape_urls: {e}")
+        print(f"Error type: {type(e).__name__}")
+        print(f"Error details: {e.args}")
+    return content, unfinished
+
+
 async def summarize(query, content, agent_role_prompt, cfg, websocket=None):
     """
     Asynchronously summarizes a list of URLs.
@@ -201,6 +247,37 @@ async def summarize_url(query, raw_data, agent_role_prompt, cfg):
 
 
 
+async def pack_context(context, cfg, websocket=None):
+    """
+    Fits the research context into the configured input token budget of the smart model.
+    If blocks had to be dropped, the tokens dropped per source are streamed as logs.
+    Args:
+        context: list of context items, one per sub-query
+        cfg: Config
+        websocket: websocket the summary is streamed to (optional)
+    Returns:
+        context: list of context strings
+    """
+    packer = ContextPacker(budget=cfg.context_token_budget, model=cfg.smart_llm_model)
+    packed = packer.pack(context)
+    if packer.dropped:
+        dropped = {}
+        for item in packer.dropped:
+            entry = dropped.setdefault(item["source"] or "unknown source", {"tokens": 0, "reasons": set()})
+            entry["tokens"] += item["tokens"]
+            entry["reasons"].add(item["reason"].replace("_", " "))
+        summary = (
+            f"Context packed into {packer.stats['tokens']} tokens: kept {packer.stats['kept']} of "
+            f"{packer.stats['blocks']} blocks, dropped {packer.stats['tokens_dropped']} tokens\n"
+        )
+        summary += "".join(
+            f"- {source}: {entry['tokens']} tokens ({', '.join(sorted(entry['reasons']))})\n"
+            for source, entry in dropped.items()
+        )
+        await stream_output("logs", summary, websocket)
+    return packed
+
+
 async def generate_report(
     query,
     context,
@@ -216,6 +293,7 @@ async def generate_report(
 ):
     generate_prompt = get_report_by_type(report_type, retained_text, deleted_text, cadence)
     report = ""
+    context = await pack_context(context, cfg, websocket)
     if report_type == "subtopic_report":
         content = f"{generate_prompt(query, existing_headers, main_topic, context, cfg.report_format, cfg.total_words)}"
     else:
@@ -261,6 +339,7 @@ async def stream_output(type, output, websocket=None, logging=True):
 
 
 async def get_report_introduction(query, context, role, config, websocket=None, cadence=""):
+    context = await pack_context(context, config, websocket)
     try:
         introduction = await create_chat_completion(
             model=config.smart_llm_model,
@@ -343,15 +422,14 @@ def table_of_contents(markdown_text: str):
         print("table_of_contents Exception : ", e)  # Print exception if any
         return markdown_text  # Return original markdown text if an exception occurs
 
-def add_source_urls(report_markdown: str, visited_urls: set):
+def add_source_urls(report_markdown: str, visited_urls):
     """
-    This function takes a Markdown report and a set of visited URLs as input parameters.
+    This function takes a Markdown report and the URLs of the pages it was written from as input parameters.
     
     Args:
     report_markdown (str): The `add_source_urls` function takes in two parameters:
-    visited_urls (set): Visited_urls is a set that contains URLs that have already been visited. This
-    parameter is used to keep track of which URLs have already been included in the report_markdown to
-    avoid duplication.
+    visited_urls (iterable): The URLs of the pages used for the report, each listed once in the
+    references section.
     """
     try:
         url_markdown = "\n\n\n## References\n\n"
@@ -1 +1,4 @@
-from .embeddings import Memory
+from .embeddings import Memory, wrap_embeddings
+from .cache import CachedEmbeddings, EmbeddingCache, get_embedding_cache
+from .batcher import BatchedEmbeddings, EmbeddingBatcher, get_embedding_batcher
+from .local import LocalEmbeddings, get_local_embeddings
@@ -0,0 +1,165 @@
+import asyncio
+
+from langchain.embeddings.base import Embeddings
+
+from reach_core.utils.tokens import count_tokens, warm_encodings
+
+from .cache import embedding_model_name
+
+
+class EmbeddingBatcher:
+    """
+    Packs embedding requests of every research session in the process into provider-sized batches.
+    Texts are queued, gathered into batches up to the per-request item and token limits, and sent
+    concurrently under a cap. When every slot is busy the queue fills up and callers wait to
+    enqueue (backpressure) instead of piling up requests. Identical texts in flight are embedded once.
+    """
+    def __init__(self, embed_documents, max_batch_items=512, max_batch_tokens=100_000, max_concurrency=4,
+                 max_pending=4096, linger=0.005, model=None):
+        """
+        Args:
+            embed_documents: blocking function embedding a list of texts, run in a worker thread
+            max_batch_items: texts per provider request
+            max_batch_tokens: tokens per provider request
+            max_concurrency: provider requests in flight at once
+            max_pending: queued texts before callers have to wait
+            linger: seconds the first text of a batch waits for more texts to arrive
+            model: model whose tokenizer counts the tokens (optional)
+        """
+        self.embed_documents = embed_documents
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.linger = linger
+        self.model = model
+        self.stats = {"texts": 0, "coalesced": 0, "batches": 0, "tokens": 0, "errors": 0}
+        self._queue = asyncio.Queue(max_pending)
+        self._pending = {}
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._tasks = set()
+        self._worker = None
+
+    async def embed(self, texts):
+        """
+        Embeds the texts
+        Returns:
+            list of vectors, in the order of texts
+        """
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = self._pending.get(text)
+            if future is None:
+                # The future is registered only once the text is queued: a caller cancelled while
+                # waiting for room must not leave behind a future nothing will ever resolve
+                await self._queue.put(text)
+                future = self._pending.get(text)
+                if future is None:
+                    future = self._pending[text] = loop.create_future()
+            else:
+                self.stats["coalesced"] += 1
+            futures.append(future)
+        self.stats["texts"] += len(texts)
+        # Shielded, so a cancelled caller does not cancel texts another session is waiting for
+        return list(await asyncio.gather(*(asyncio.shield(future) for future in futures)))
+
+    async def _run(self):
+        # The first count loads the tokenizer, which may download its vocabulary
+        await asyncio.to_thread(warm_encodings, [self.model])
+        carry = None
+        while True:
+            text, tokens = carry if carry else (await self._queue.get(), None)
+            carry = None
+            batch = [text]
+            batch_tokens = tokens if tokens is not None else count_tokens(text, self.model)
+            if self._queue.qsize() < self.max_batch_items:
+                await asyncio.sleep(self.linger)
+            while len(batch) < self.max_batch_items and not self._queue.empty():
+                text = self._queue.get_nowait()
+                tokens = count_tokens(text, self.model)
+                if batch_tokens + tokens > self.max_batch_tokens:
+                    carry = (text, tokens)
+                    break
+                batch.append(text)
+                batch_tokens += tokens
+
+            # Waiting for a free slot here is what propagates backpressure to the queue
+            await self._slots.acquire()
+            task = asyncio.create_task(self._send(batch, batch_tokens))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch, tokens):
+        try:
+            vectors = await asyncio.to_thread(self.embed_documents, batch)
+            if len(vectors) != len(batch):
+                raise ValueError(f"expected {len(batch)} embeddings, got {len(vectors)}")
+            self.stats["batches"] += 1
+            self.stats["tokens"] += tokens
+            for text, vector in zip(batch, vectors):
+                # A text queued twice (by callers that waited for room at the same time) is resolved once
+                future = self._pending.pop(text, None)
+                if future is not None and not future.done():
+                    future.set_result(vector)
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"Embedding batch of {len(batch)} texts failed: {type(e).__name__} {e}")
+            for text in batch:
+                future = self._pending.pop(text, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper whose async methods go through the process-wide EmbeddingBatcher of the model.
+    The blocking methods call the wrapped provider directly.
+    """
+    def __init__(self, embeddings, cfg=None):
+        self.embeddings = embeddings
+        self.cfg = cfg
+
+    def embed_documents(self, texts):
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
+
+    async def aembed_documents(self, texts):
+        return await get_embedding_batcher(self.embeddings, self.cfg).embed(texts)
+
+    async def aembed_query(self, text):
+        return await asyncio.to_thread(self.embeddings.embed_query, text)
+
+
+_batchers = {}
+_batchers_loop = None
+
+
+def get_embedding_batcher(embeddings, cfg=None):
+    """
+    Gets the process-wide batcher of the embedding model, bound to the running event loop
+    Args:
+        embeddings: LangChain embeddings of the provider
+        cfg: Config (optional)
+    """
+    global _batchers_loop
+    loop = asyncio.get_running_loop()
+    if _batchers_loop is not loop:
+        _batchers.clear()
+        _batchers_loop = loop
+    model = embedding_model_name(embeddings)
+    if model not in _batchers:
+        tokenizer_model = getattr(embeddings, "model", None)
+        _batchers[model] = EmbeddingBatcher(
+            embeddings.embed_documents,
+            # Providers may declare their own limits, e.g. local CPU models batch small and one at a time
+            max_batch_items=getattr(embeddings, "max_batch_items", None) or (cfg.embedding_batch_max_items if cfg else 512),
+            max_batch_tokens=cfg.embedding_batch_max_tokens if cfg else 100_000,
+            max_concurrency=getattr(embeddings, "max_concurrency", None) or (cfg.embedding_max_concurrency if cfg else 4),
+            model=tokenizer_model if isinstance(tokenizer_model, str) else None,
+        )
+    return _batchers[model]
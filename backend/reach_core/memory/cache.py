@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import os
+import time
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from reach_core.utils.cache import DiskCache, LRUCache
+
+
+def embedding_model_name(embeddings):
+    """Identifies the embedding model, so vectors of different models never share a cache entry"""
+    model = getattr(embeddings, "model", None) or getattr(embeddings, "model_name", None) or ""
+    return f"{type(embeddings).__name__}:{model}"
+
+
+class EmbeddingCache:
+    """
+    Two tier cache of embedding vectors keyed by hash(model, text).
+    Vectors are kept as float32 in an in-memory LRU and optionally in a disk tier shared across runs.
+    A 1536 dimension vector takes 6 KB, so the memory tier defaults to a few thousand entries (~25 MB).
+    The disk tier expires entries after disk_ttl and is pruned to disk_max_entries every prune_interval.
+    """
+    def __init__(self, max_entries=4096, disk_path=None, disk_max_entries=50_000, disk_ttl=30 * 24 * 60 * 60,
+                 prune_interval=15 * 60):
+        """
+        Args:
+            max_entries: vectors kept in memory before the least recently used one is evicted
+            disk_path: SQLite file of the disk tier (optional)
+            disk_max_entries: vectors kept on disk, the oldest ones beyond this count are pruned
+            disk_ttl: seconds a vector stays on disk
+            prune_interval: minimum seconds between two prunes of the disk tier
+        """
+        self.memory = LRUCache(max_entries)
+        self.disk = DiskCache(disk_path, max_entries=disk_max_entries) if disk_path else None
+        self.disk_ttl = disk_ttl
+        self.prune_interval = prune_interval
+        self._last_prune = 0.0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(model, text):
+        return hashlib.blake2b(f"{model}\0{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_many(self, model, texts):
+        """
+        Looks up the vectors of several texts, checking the disk tier once for all memory misses
+        Returns:
+            list of float32 arrays, None where the text is not cached
+        """
+        keys = [self.key(model, text) for text in texts]
+        vectors = [self.memory.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.stats["memory_hits"] += len(keys) - len(missing)
+
+        if self.disk and missing:
+            found = self.disk.get_many(keys[i] for i in missing)
+            for i in missing:
+                if keys[i] in found:
+                    vector = np.frombuffer(found[keys[i]][0], dtype=np.float32)
+                    self.memory.set(keys[i], vector)
+                    vectors[i] = vector
+                    self.stats["disk_hits"] += 1
+
+        self.stats["misses"] += sum(vector is None for vector in vectors)
+        return vectors
+
+    def set_many(self, model, texts, vectors):
+        items = {}
+        for text, vector in zip(texts, vectors):
+            key = self.key(model, text)
+            vector = np.asarray(vector, dtype=np.float32)
+            self.memory.set(key, vector)
+            items[key] = vector.tobytes()
+        if self.disk and items:
+            self.disk.set_many(items, ttl=self.disk_ttl)
+            self.maybe_prune()
+
+    def maybe_prune(self):
+        """Prunes the disk tier if the last prune is older than prune_interval, the first write prunes at once"""
+        now = time.time()
+        if now - self._last_prune < self.prune_interval:
+            return
+        self._last_prune = now
+        removed = self.disk.prune()
+        if removed:
+            print(f"Embedding cache: pruned {removed} vectors from disk")
+
+    def metrics(self):
+        lookups = sum(self.stats.values())
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "evictions": self.memory.stats.evictions,
+            "disk_evictions": self.disk.stats.evictions if self.disk else 0,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only sends cache misses to the wrapped provider.
+    Drop-in replacement for the LangChain embeddings returned by Memory.get_embeddings().
+    The async methods read and write the cache (SQLite queries and prunes) in a worker thread.
+    """
+    def __init__(self, embeddings, cache):
+        """
+        Args:
+            embeddings: LangChain embeddings of the provider
+            cache: EmbeddingCache
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = embedding_model_name(getattr(embeddings, "embeddings", embeddings))
+
+    def _lookup(self, texts):
+        vectors = self.cache.get_many(self.model, texts)
+        # Identical chunks in one batch are embedded once
+        misses = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        return vectors, misses
+
+    def _merge(self, texts, vectors, misses, embedded):
+        if misses:
+            self.cache.set_many(self.model, misses, embedded)
+            embedded = dict(zip(misses, embedded))
+            vectors = [embedded[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in vectors]
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        vectors, misses = self._lookup(texts)
+        embedded = self.embeddings.embed_documents(misses) if misses else []
+        return self._merge(texts, vectors, misses, embedded)
+
+    async def aembed_documents(self, texts):
+        texts = list(texts)
+        vectors, misses = await asyncio.to_thread(self._lookup, texts)
+        embedded = await self.embeddings.aembed_documents(misses) if misses else []
+        return await asyncio.to_thread(self._merge, texts, vectors, misses, embedded)
+
+    def embed_query(self, text):
+        # Some providers embed queries differently from documents, so they are cached apart
+        model = f"{self.model}:query"
+        vector = self.cache.get_many(model, [text])[0]
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.set_many(model, [text], [vector])
+        return np.asarray(vector, dtype=np.float32).tolist()
+
+    async def aembed_query(self, text):
+        model = f"{self.model}:query"
+        vector = (await asyncio.to_thread(self.cache.get_many, model, [text]))[0]
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await asyncio.to_thread(self.cache.set_many, model, [text], [vector])
+        return np.asarray(vector, dtype=np.float32).tolist()
+
+
+_cache = None
+
+
+def get_embedding_cache(cfg=None):
+    """
+    Gets the process-wide embedding cache, or None if caching is disabled
+    Args:
+        cfg: Config (optional)
+    """
+    global _cache
+    if cfg is not None and not cfg.embedding_cache_enabled:
+        return None
+    if _cache is None:
+        disk_path = None
+        if cfg is None or cfg.embedding_cache_disk:
+            disk_path = os.path.join(cfg.cache_dir if cfg else ".cache", "embeddings.sqlite")
+        _cache = EmbeddingCache(
+            max_entries=cfg.embedding_cache_max_entries if cfg else 4096,
+            disk_path=disk_path,
+            disk_max_entries=cfg.embedding_cache_disk_max_entries if cfg else 50_000,
+            disk_ttl=cfg.embedding_cache_disk_ttl if cfg else 30 * 24 * 60 * 60,
+        )
+    return _cache
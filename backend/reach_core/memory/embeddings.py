@@ -1,8 +1,11 @@
 from langchain.vectorstores import FAISS
 
+from .batcher import BatchedEmbeddings
+from .cache import CachedEmbeddings, get_embedding_cache
+
 
 class Memory:
-    def __init__(self, embedding_provider, **kwargs):
+    def __init__(self, embedding_provider, cfg=None, **kwargs):
 
         _embeddings = None
         match embedding_provider:
@@ -15,11 +18,28 @@ class Memory:
             case "huggingface":
                 from langchain.embeddings import HuggingFaceEmbeddings
                 _embeddings = HuggingFaceEmbeddings()
+            case "local":
+                from .local import get_local_embeddings
+                _embeddings = get_local_embeddings(cfg)
 
             case _:
                 raise Exception("Embedding provider not found.")
 
-        self._embeddings = _embeddings
+        self._embeddings = wrap_embeddings(_embeddings, cfg)
 
     def get_embeddings(self):
         return self._embeddings
+
+
+def wrap_embeddings(embeddings, cfg=None):
+    """
+    Wraps the LangChain embeddings of a provider in the batching and caching layers Memory uses
+    Args:
+        embeddings: LangChain embeddings of the provider
+        cfg: Config (optional)
+    """
+    # Async embedding requests of all sessions are packed into provider-sized batches
+    embeddings = BatchedEmbeddings(embeddings, cfg)
+    # Chunks embedded before, in this run or an earlier one, are served from the cache
+    cache = get_embedding_cache(cfg)
+    return CachedEmbeddings(embeddings, cache) if cache else embeddings
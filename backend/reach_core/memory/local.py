@@ -0,0 +1,136 @@
+import os
+import threading
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+
+from reach_core.utils.cpu import available_cpus
+
+
+class LocalEmbeddings(Embeddings):
+    """
+    Sentence embeddings computed on the CPU with ONNX Runtime.
+    The model is downloaded from the Hugging Face hub once, dynamically quantized to int8 and
+    cached, and the inference session uses as many intra-op threads as the container may use.
+    Needs onnxruntime, tokenizers and huggingface_hub. Quantizing also needs onnx, from
+    requirements-quantize.txt; without it the fp32 model is used unless a quantized one is cached.
+    """
+    # Read by the EmbeddingBatcher: CPU inference gains nothing from concurrent batches
+    max_batch_items = 64
+    max_concurrency = 1
+
+    def __init__(self, model_name="sentence-transformers/all-MiniLM-L6-v2", onnx_file="onnx/model.onnx",
+                 quantize=True, threads=None, batch_size=64, max_length=256, cache_dir=".cache"):
+        """
+        Args:
+            model_name: Hugging Face repository of the model
+            onnx_file: path of the ONNX export inside the repository
+            quantize: quantize the weights to int8 before loading
+            threads: intra-op threads, defaults to the CPUs available to the process
+            batch_size: texts per inference call
+            max_length: tokens per text, longer texts are truncated
+            cache_dir: directory the quantized model is written to
+        """
+        import onnxruntime
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_batch_items = batch_size
+
+        model_path = hf_hub_download(model_name, onnx_file)
+        quantized_path = self._quantized(model_path, cache_dir) if quantize else None
+        self.quantized = quantized_path is not None
+        model_path = quantized_path or model_path
+        # The int8 and fp32 models give different vectors, so the mode is part of the name the
+        # embedding cache keys them by
+        self.model = f"{model_name}:{'int8' if self.quantized else 'fp32'}"
+
+        self.tokenizer = Tokenizer.from_pretrained(model_name)
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads or available_cpus()
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        # One session is shared by every thread; runs are serialized so the intra-op threads are not oversubscribed
+        self._lock = threading.Lock()
+
+    def _quantized(self, model_path, cache_dir):
+        """Returns the path of the int8 model, quantizing it on first use, or None if onnx is not installed"""
+        quantized_path = os.path.join(cache_dir, "models", f"{self.model_name.replace('/', '--')}-int8.onnx")
+        if not os.path.exists(quantized_path):
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError as e:
+                print(f"Cannot quantize {self.model_name}, using the fp32 model "
+                      f"(install requirements-quantize.txt to quantize): {e}")
+                return None
+            os.makedirs(os.path.dirname(quantized_path), exist_ok=True)
+            print(f"Quantizing {self.model_name} to int8...")
+            tmp_path = f"{quantized_path}.tmp"
+            quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, quantized_path)
+        return quantized_path
+
+    def _embed_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+        with self._lock:
+            hidden = self.session.run(None, inputs)[0]
+
+        # Mean pooling over the real tokens, then L2 normalization
+        mask = attention_mask[:, :, None].astype(np.float32)
+        vectors = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        # Texts of similar length are batched together so little compute goes to padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            embedded = self._embed_batch([texts[i] for i in batch])
+            if not vectors.shape[1]:
+                vectors = np.empty((len(texts), embedded.shape[1]), dtype=np.float32)
+            vectors[batch] = embedded
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self._embed_batch([text])[0].tolist()
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_local_embeddings(cfg=None):
+    """
+    Gets the process-wide local embedding model, loading it on first use
+    Args:
+        cfg: Config (optional)
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = LocalEmbeddings(
+                model_name=cfg.local_embedding_model if cfg else "sentence-transformers/all-MiniLM-L6-v2",
+                onnx_file=cfg.local_embedding_onnx_file if cfg else "onnx/model.onnx",
+                quantize=cfg.local_embedding_quantize if cfg else True,
+                threads=(cfg.local_embedding_threads or None) if cfg else None,
+                batch_size=cfg.local_embedding_batch_size if cfg else 64,
+                cache_dir=cfg.cache_dir if cfg else ".cache",
+            )
+    return _model
@@ -5,6 +5,7 @@ from fastapi import WebSocket
 from reach_core.master.agent import Reach
 from reach_core.master.functions import (add_source_urls, extract_headers,
                                             table_of_contents)
+from reach_core.runtime import get_runtime
 
 
 class DetailedReport():
@@ -17,18 +18,16 @@ class DetailedReport():
         self.websocket = websocket
         self.subtopics = subtopics
         self.cadence = cadence
+        # Every assistant of the report shares the process-wide config and clients
+        self.runtime = get_runtime(config_path)
 
         # A parent task assistant
-        self.main_task_assistant = Reach(self.query, self.report_type, self.source_urls, self.sources, self.config_path, self.websocket, self.cadence)
+        self.main_task_assistant = Reach(self.query, self.report_type, self.source_urls, self.sources, self.config_path, self.websocket, self.cadence, runtime=self.runtime)
 
         self.existing_headers = []
         # This is a global variable to store the entire context accumulated at any point through searching and scraping
         self.global_context = []
 
-        # This is a global variable to store the entire url list accumulated at any point through searching and scraping
-        if self.source_urls:
-            self.global_urls = set(self.source_urls)
-
     async def run(self):
 
         # Conduct initial research using the main assistant
@@ -43,9 +42,6 @@ class DetailedReport():
         # Generate the subtopic reports based on the subtopics gathered
         _, report_body = await self._generate_subtopic_reports(subtopics)
 
-        # Construct the final list of visited urls
-        self.main_task_assistant.visited_urls.update(self.global_urls)
-
         # Construct the final detailed report (Optionally add more details to the report)
         report = await self._construct_detailed_report(report_introduction, report_body)
 
@@ -56,7 +52,7 @@ class DetailedReport():
         await self.main_task_assistant.conduct_research()
         # Update context of the global context variable
         self.global_context = self.main_task_assistant.context
-        # Update url list of the global list variable
+        # Every assistant claims urls from the same index, so subtopics skip pages already scraped
         self.global_urls = self.main_task_assistant.visited_urls
 
     async def _get_all_subtopics(self) -> list:
@@ -109,7 +105,10 @@ class DetailedReport():
             visited_urls=self.global_urls,
             agent=self.main_task_assistant.agent,
             role=self.main_task_assistant.role,
-            cadence=self.cadence
+            cadence=self.cadence,
+            near_duplicates=self.main_task_assistant.near_duplicates,
+            run_index=self.main_task_assistant.run_index,
+            runtime=self.runtime
         )
 
         # The subtopics should start research from the context gathered till now
@@ -124,8 +123,6 @@ class DetailedReport():
 
         # Update context of the global context variable
         self.global_context = list(set(subtopic_assistant.context))
-        # Update url list of the global list variable
-        self.global_urls.update(subtopic_assistant.visited_urls)
 
         # After a subtopic report has been generated then append the headers of the report to existing headers
         self.existing_headers.append(
@@ -141,7 +138,7 @@ class DetailedReport():
         # Generating a table of contents from report headers
         toc = table_of_contents(report_body)
 
-        # Concatenating all source urls at the end of the report
-        report_with_references = add_source_urls(report_body, self.main_task_assistant.visited_urls)
+        # Concatenating the urls of every page used by the report at the end of it
+        report_with_references = add_source_urls(report_body, self.main_task_assistant.run_index.urls)
 
         return f"{introduction}\n\n{toc}\n\n{report_with_references}" 
\ No newline at end of file
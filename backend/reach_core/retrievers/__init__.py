@@ -1,5 +1,10 @@
-from .searx.searx import SearxSearch
+from .searx.searx import SearxSearch, SearxClient, get_searx_client
+from .cache import SearchCache, get_search_cache
 
 __all__ = [
-    "SearxSearch"
+    "SearxSearch",
+    "SearxClient",
+    "get_searx_client",
+    "SearchCache",
+    "get_search_cache"
 ]
@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import time
+import unicodedata
+
+from reach_core.utils.cache import DiskCache, LRUCache
+
+# Recency window searched for each report cadence
+CADENCE_WINDOWS = {
+    "daily": "day",
+    "weekly": "week",
+    "monthly": "month",
+}
+
+# How long search results stay valid for each recency window
+WINDOW_TTLS = {
+    "day": 60 * 60,
+    "week": 6 * 60 * 60,
+    "month": 24 * 60 * 60,
+    "any": 24 * 60 * 60,
+}
+
+_NOISE = re.compile(r"[^\w\s\"'-]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """
+    Normalizes a query so trivially different spellings share a cache entry:
+    unicode compatibility form, lowercase, punctuation other than quotes and dashes dropped,
+    whitespace collapsed
+    """
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = _NOISE.sub(" ", query)
+    return _SPACES.sub(" ", query).strip()
+
+
+class SearchCache:
+    """
+    TTL cache of search results keyed by normalized query and cadence recency window.
+    Entries live in an in-memory LRU and optionally in a disk tier shared across restarts.
+    """
+    def __init__(self, max_entries=2048, disk_path=None):
+        """
+        Args:
+            max_entries: entries kept in memory before the least recently used one is evicted
+            disk_path: SQLite file of the disk tier (optional)
+        """
+        self.memory = LRUCache(max_entries)
+        self.disk = DiskCache(disk_path) if disk_path else None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def window(cadence):
+        return CADENCE_WINDOWS.get((cadence or "").lower(), "any")
+
+    def key(self, query, cadence=""):
+        return f"{self.window(cadence)}:{normalize_query(query)}"
+
+    def get(self, query, cadence="", max_results=7):
+        """
+        Gets cached results for the query
+        Returns:
+            results: list of {"href", "body"} dicts, or None on a miss or if fewer
+            results than max_results were cached
+        """
+        key = self.key(query, cadence)
+        entry = self.memory.get(key)
+        if entry is not None and entry["max_results"] >= max_results:
+            self.stats["memory_hits"] += 1
+            return entry["results"][:max_results]
+
+        if self.disk:
+            found = self.disk.get(key)
+            if found is not None:
+                entry = json.loads(found[0])
+                if entry["max_results"] >= max_results:
+                    # Promoted for what is left of its TTL, not a fresh one
+                    remaining = WINDOW_TTLS[self.window(cadence)] - (time.time() - found[1])
+                    self.memory.set(key, entry, ttl=remaining)
+                    self.stats["disk_hits"] += 1
+                    return entry["results"][:max_results]
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, query, results, cadence="", max_results=7):
+        key = self.key(query, cadence)
+        ttl = WINDOW_TTLS[self.window(cadence)]
+        entry = {"max_results": max_results, "results": results}
+        self.memory.set(key, entry, ttl=ttl)
+        if self.disk:
+            self.disk.set(key, json.dumps(entry).encode("utf-8"), ttl=ttl)
+
+    def metrics(self):
+        lookups = sum(self.stats.values())
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "evictions": self.memory.stats.evictions,
+        }
+
+
+_cache = None
+
+
+def get_search_cache(cfg=None):
+    """
+    Gets the process-wide search cache, or None if caching is disabled
+    Args:
+        cfg: Config (optional)
+    """
+    global _cache
+    if cfg is not None and not cfg.search_cache_enabled:
+        return None
+    if _cache is None:
+        disk_path = None
+        if cfg is None or cfg.search_cache_disk:
+            disk_path = os.path.join(cfg.cache_dir if cfg else ".cache", "search.sqlite")
+        _cache = SearchCache(
+            max_entries=cfg.search_cache_max_entries if cfg else 2048,
+            disk_path=disk_path,
+        )
+    return _cache
@@ -1,7 +1,115 @@
 
 # libraries
+import asyncio
 import os
-from langchain.utilities import SearxSearchWrapper
+
+import httpx
+
+from reach_core.utils.clients import LoopBoundClients
+
+from ..cache import CADENCE_WINDOWS, get_search_cache
+
+
+class SearxClient:
+    """
+    Async SearxNG client on a persistent connection pool.
+    Talks to the JSON API directly and returns results already normalized to href/body.
+    """
+    def __init__(self, host=None, query_timeout=20, request_timeout=10, retries=2, max_connections=20):
+        """
+        Args:
+            host: SearxNG base url, defaults to the SEARX_URL environment variable
+            query_timeout: seconds allowed for one query, all result pages and retries included
+            request_timeout: seconds allowed for a single HTTP request
+            retries: extra attempts after a transport error, 429 or 5xx
+            max_connections: size of the connection pool
+        """
+        self.host = (host or os.environ["SEARX_URL"]).rstrip("/")
+        self.query_timeout = query_timeout
+        self.retries = retries
+        self.client = httpx.AsyncClient(
+            timeout=request_timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+
+    async def search(self, query, max_results=7, time_range=None):
+        """
+        Searches the query, reading further result pages until max_results are found
+        Args:
+            query: search query
+            max_results: number of results to return
+            time_range: optional SearxNG time range ("day", "week", "month" or "year")
+        Returns:
+            results: list of {"href", "body"} dicts
+        """
+        return await asyncio.wait_for(self._search(query, max_results, time_range), self.query_timeout)
+
+    async def _search(self, query, max_results, time_range):
+        results = []
+        seen = set()
+        for page in range(1, 4):
+            params = {"q": query, "format": "json", "pageno": page}
+            if time_range:
+                params["time_range"] = time_range
+            data = await self._get(params)
+            page_results = data.get("results", [])
+            for obj in page_results:
+                href = obj.get("url", "")
+                if href and href not in seen:
+                    seen.add(href)
+                    results.append({"href": href, "body": obj.get("content", "")})
+            if len(results) >= max_results or not page_results:
+                break
+        return results[:max_results]
+
+    async def _get(self, params):
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self.client.get(f"{self.host}/search", params=params)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code != 429 and e.response.status_code < 500 or attempt == self.retries:
+                    raise
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+            await asyncio.sleep(0.5 * 2 ** attempt)
+
+    async def search_many(self, queries, max_results=7, time_range=None):
+        """
+        Runs all queries concurrently. A failed query yields an empty result list.
+        Returns:
+            results: list of result lists, in the order of queries
+        """
+        responses = await asyncio.gather(
+            *(self.search(query, max_results, time_range) for query in queries), return_exceptions=True
+        )
+        results = []
+        for query, response in zip(queries, responses):
+            if isinstance(response, BaseException):
+                print(f"Searx search failed for '{query}': {type(response).__name__} {response}")
+                response = []
+            results.append(response)
+        return results
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_clients = LoopBoundClients()
+
+
+def get_searx_client(cfg=None):
+    """
+    Gets the process-wide SearxNG client, bound to the running event loop
+    Args:
+        cfg: Config (optional)
+    """
+    return _clients.get("searx", lambda: SearxClient(
+        query_timeout=cfg.search_timeout if cfg else 20,
+        retries=cfg.search_retries if cfg else 2,
+    ))
 
 
 class SearxSearch():
@@ -22,8 +130,40 @@ class SearxSearch():
         Searches the query
         Returns:
         """
-        searx = SearxSearchWrapper(searx_host=os.environ["SEARX_URL"])
-        results = searx.results(self.query, max_results)
+        response = httpx.get(
+            f"{os.environ['SEARX_URL'].rstrip('/')}/search",
+            params={"q": self.query, "format": "json"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        results = response.json().get("results", [])[:max_results]
         # Normalizing results to match the format of the other search APIs
-        search_response = [{"href": obj.get("link", ""), "body": obj.get("snippet", "")} for obj in results]
+        search_response = [{"href": obj.get("url", ""), "body": obj.get("content", "")} for obj in results]
         return search_response
+
+    async def asearch(self, max_results=7, cfg=None, cadence=""):
+        """
+        Searches the query on the shared connection pool
+        Returns:
+        """
+        return (await SearxSearch.asearch_many([self.query], max_results, cfg, cadence))[0]
+
+    @staticmethod
+    async def asearch_many(queries, max_results=7, cfg=None, cadence=""):
+        """
+        Searches all queries concurrently on the shared connection pool, limited to the recency
+        window of the cadence. Queries found in the search cache are not sent to SearxNG.
+        Returns:
+            results: list of result lists, in the order of queries
+        """
+        cache = get_search_cache(cfg)
+        results = [cache.get(query, cadence, max_results) if cache else None for query in queries]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if misses:
+            time_range = CADENCE_WINDOWS.get((cadence or "").lower())
+            fetched = await get_searx_client(cfg).search_many([queries[i] for i in misses], max_results, time_range)
+            for i, response in zip(misses, fetched):
+                results[i] = response
+                if cache and response:
+                    cache.set(queries[i], response, cadence, max_results)
+        return results
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+from reach_core.config import Config
+from reach_core.memory import Memory
+from reach_core.utils.tokens import warm_encodings
+
+
+class Runtime:
+    """
+    Long-lived objects shared by every research run of the process: the config, the embeddings,
+    the LLM providers and the search retriever. Clients are built on first use and then reused,
+    so their HTTP connection pools and TLS sessions survive from one request to the next.
+    """
+    def __init__(self, config_path=None):
+        """
+        Args:
+            config_path: config file, defaults to the CONFIG_FILE environment variable
+        """
+        self.cfg = Config(config_path)
+        self._memories = {}
+        self._llms = {}
+        self._llms_loop = None
+        self._openai = None
+        self._lock = threading.Lock()
+
+    def memory(self, embedding_provider=None):
+        """
+        Gets the Memory of an embedding provider, defaults to the configured one
+        """
+        embedding_provider = embedding_provider or self.cfg.embedding_provider
+        with self._lock:
+            if embedding_provider not in self._memories:
+                self._memories[embedding_provider] = Memory(embedding_provider, cfg=self.cfg)
+            return self._memories[embedding_provider]
+
+    def warm_up(self):
+        """
+        Loads what the first research run would otherwise load on the event loop: the tokenizers of
+        the configured models, whose vocabulary may be downloaded, and the configured embeddings with
+        their cache. Blocking, meant to run in a thread at startup.
+        """
+        warm_encodings([self.cfg.fast_llm_model, self.cfg.smart_llm_model])
+        self.memory()
+
+    @property
+    def retriever(self):
+        # The retriever class searches through its own process-wide connection pool
+        from reach_core.master.functions import get_retriever
+        return get_retriever(self.cfg.retriever)
+
+    def llm(self, llm_provider, model, temperature=1.0, max_tokens=None):
+        """
+        Gets the provider instance for a model and its sampling settings.
+        Providers hold async clients, so they are bound to the running event loop.
+        Args:
+            llm_provider: provider name
+            model: model name
+            temperature: sampling temperature
+            max_tokens: maximum tokens of the completion
+        """
+        from reach_core.utils.llm import get_provider
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        key = (llm_provider, model, temperature, max_tokens)
+        with self._lock:
+            if loop is not self._llms_loop:
+                self._llms = {}
+                self._llms_loop = loop
+            if key not in self._llms:
+                self._llms[key] = get_provider(llm_provider)(model, temperature, max_tokens)
+            return self._llms[key]
+
+    def chat_model(self, model, temperature=0.7, max_tokens=None):
+        """Gets the LangChain ChatOpenAI of a model, for chains that need a chat model object"""
+        return self.llm("openai", model, temperature, max_tokens).llm
+
+    def openai_client(self):
+        """Gets the OpenAI SDK client used by the server endpoints"""
+        with self._lock:
+            if self._openai is None:
+                from openai import OpenAI
+                self._openai = OpenAI()
+            return self._openai
+
+
+_runtimes = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_runtime(config_path=None):
+    """
+    Gets the process-wide runtime of a config file
+    Args:
+        config_path: config file (optional)
+    """
+    with _runtimes_lock:
+        if config_path not in _runtimes:
+            _runtimes[config_path] = Runtime(config_path)
+        return _runtimes[config_path]
@@ -1,3 +1,19 @@
 from .scraper import Scraper
+from .engine import FetchResult, ScrapeEngine, get_scrape_engine, sniff_kind
+from .cache import ScrapeCache, get_scrape_cache
+from .parsing import ParsePool, get_parse_pool
+from .health import HostHealthRegistry, get_host_health
 
-__all__ = ["Scraper"]
\ No newline at end of file
+__all__ = [
+    "Scraper",
+    "ScrapeEngine",
+    "FetchResult",
+    "sniff_kind",
+    "get_scrape_engine",
+    "ScrapeCache",
+    "get_scrape_cache",
+    "ParsePool",
+    "get_parse_pool",
+    "HostHealthRegistry",
+    "get_host_health",
+]
\ No newline at end of file
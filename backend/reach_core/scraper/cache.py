@@ -0,0 +1,102 @@
+import json
+import os
+import time
+
+from reach_core.utils.cache import DiskCache
+from reach_core.utils.urls import canonicalize_url, get_recent_urls
+
+# How long a scraped page is served without revalidation, per report cadence
+CADENCE_TTLS = {
+    "daily": 6 * 60 * 60,
+    "weekly": 24 * 60 * 60,
+    "monthly": 3 * 24 * 60 * 60,
+}
+DEFAULT_TTL = 24 * 60 * 60
+
+# Entries older than this are dropped entirely instead of being revalidated
+MAX_AGE = 30 * 24 * 60 * 60
+
+
+def cache_key(url):
+    """
+    Builds the cache key for a url: its canonical form, so urls that only differ in tracking
+    parameters, fragment or query order share one entry
+    """
+    return canonicalize_url(url)
+
+
+class ScrapeCache:
+    """
+    Persistent cache of extracted page text keyed by url.
+    Stores the validators (ETag / Last-Modified) so stale pages can be revalidated
+    with a conditional GET instead of being downloaded and parsed again.
+    """
+    def __init__(self, path, recent=None):
+        """
+        Args:
+            path: SQLite file of the cache
+            recent: RecentURLFilter of urls saved recently (optional). Urls it has never seen
+                are not looked up on disk.
+        """
+        self.store = DiskCache(path)
+        self.recent = recent
+
+    @staticmethod
+    def ttl_for(cadence):
+        return CADENCE_TTLS.get((cadence or "").lower(), DEFAULT_TTL)
+
+    def lookup(self, url, cadence=""):
+        """
+        Gets the cached entry for the url
+        Args:
+            url: page url
+            cadence: report cadence, decides how long an entry stays fresh
+        Returns:
+            dict with content, etag, last_modified and fresh, or None
+        """
+        if self.recent is not None and url not in self.recent:
+            return None
+        found = self.store.get(cache_key(url))
+        if found is None:
+            return None
+        value, stored_at = found
+        entry = json.loads(value)
+        entry["fresh"] = time.time() - stored_at < self.ttl_for(cadence)
+        return entry
+
+    def save(self, url, content, etag=None, last_modified=None):
+        value = json.dumps({"content": content, "etag": etag, "last_modified": last_modified})
+        self.store.set(cache_key(url), value.encode("utf-8"), ttl=MAX_AGE)
+        if self.recent is not None:
+            self.recent.add(url)
+            self.recent.maybe_save()
+
+    def revalidated(self, url):
+        """Marks the entry as fresh again after a 304 Not Modified"""
+        self.store.touch(cache_key(url))
+
+    @staticmethod
+    def conditional_headers(entry):
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+
+_caches = {}
+
+
+def get_scrape_cache(cfg=None):
+    """
+    Gets the process-wide scrape cache, or None if caching is disabled
+    Args:
+        cfg: Config (optional)
+    """
+    if cfg is not None and not cfg.scrape_cache_enabled:
+        return None
+    path = os.path.join(cfg.cache_dir if cfg else ".cache", "scrape.sqlite")
+    if path not in _caches:
+        _caches[path] = ScrapeCache(path, recent=get_recent_urls(cfg))
+    return _caches[path]
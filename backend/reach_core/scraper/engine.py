@@ -0,0 +1,200 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import httpx
+
+from reach_core.utils.clients import LoopBoundClients
+
+# Number of leading bytes inspected to decide how a body should be extracted
+SNIFF_BYTES = 4096
+
+_BINARY_SIGNATURES = (
+    b"\x89PNG", b"\xff\xd8\xff", b"GIF8", b"PK\x03\x04", b"\x1f\x8b", b"RIFF", b"OggS",
+    b"ID3", b"\x00\x00\x01\xba", b"\x1a\x45\xdf\xa3", b"7z\xbc\xaf", b"Rar!",
+)
+_HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body", b"<?xml", b"<!--", b"<meta", b"<title")
+
+
+def sniff_kind(content_type, head):
+    """
+    Decides how a body should be extracted from its Content-Type and its first bytes.
+    Magic bytes win over the header, so mislabeled PDFs and binaries are routed correctly.
+    Args:
+        content_type: Content-Type header value (may be None)
+        head: first bytes of the body
+    Returns:
+        kind: "pdf", "html", "text" or "binary"
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if b"%PDF-" in head[:1024]:
+        return "pdf"
+    if head.startswith(_BINARY_SIGNATURES) or head[4:8] == b"ftyp":
+        return "binary"
+
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:512].lower()
+    if media_type in ("text/html", "application/xhtml+xml") or start.startswith(_HTML_MARKERS):
+        return "html"
+    if media_type == "application/pdf":
+        return "pdf"
+    if media_type.startswith("text/"):
+        return "text"
+    if b"\x00" not in head and b"<" in start and b">" in start:
+        return "html"
+    return "binary"
+
+
+@dataclass
+class FetchResult:
+    """A downloaded body and what the sniffer decided it is"""
+    url: str
+    status_code: int
+    headers: httpx.Headers
+    kind: str
+    content: bytes = b""
+    encoding: str | None = None
+    aborted: str | None = None
+    # Declared (Content-Length) bytes left unread by an abort, 0 when the size was not declared
+    bytes_declared_skipped: int = 0
+
+
+class ScrapeEngine:
+    """
+    Shared asyncio HTTP engine used by the scraper.
+    Owns one pooled client so keep-alive connections are reused across sub-queries and
+    research sessions, and bounds concurrency globally and per host.
+    """
+    def __init__(self, max_connections=20, max_connections_per_host=4, timeout=10, max_bytes=10 * 1024 * 1024):
+        """
+        Initialize the ScrapeEngine class.
+        Args:
+            max_connections: maximum number of concurrent requests across all hosts
+            max_connections_per_host: maximum number of concurrent requests to a single host
+            timeout: request timeout in seconds
+            max_bytes: bodies larger than this are aborted instead of being read into memory
+        """
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.stats = {"fetched": 0, "aborted": 0, "aborted_undeclared": 0, "bytes_read": 0,
+                      "bytes_declared_skipped": 0}
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self._global_limit = asyncio.Semaphore(max_connections)
+        # Host -> (semaphore, requests holding or waiting for it); dropped once the host is idle
+        self._host_limits = {}
+
+    @asynccontextmanager
+    async def _host_slot(self, url):
+        host = urlparse(url).netloc.lower()
+        limit, users = self._host_limits.get(host, (None, 0))
+        if limit is None:
+            limit = asyncio.Semaphore(self.max_connections_per_host)
+        self._host_limits[host] = (limit, users + 1)
+        try:
+            async with limit:
+                yield
+        finally:
+            limit, users = self._host_limits[host]
+            if users == 1:
+                del self._host_limits[host]
+            else:
+                self._host_limits[host] = (limit, users - 1)
+
+    async def fetch(self, url, headers=None):
+        """
+        Streams the url, waiting for a free per-host slot and then a free global slot, so requests
+        queued behind a slow host do not hold global slots other hosts could use.
+        The first SNIFF_BYTES decide the body kind; binaries and bodies over max_bytes are
+        aborted without being read into memory.
+        A 304 answer to a conditional request is returned as kind "not_modified", not raised.
+        Args:
+            url: url to fetch
+            headers: extra request headers
+        Returns:
+            FetchResult
+        """
+        async with self._host_slot(url), self._global_limit:
+            async with self.client.stream("GET", url, headers=headers) as response:
+                # Checked before raise_for_status, which treats 304 as an error
+                if response.status_code == 304:
+                    return FetchResult(url, 304, response.headers, "not_modified")
+                response.raise_for_status()
+                return await self._read_body(url, response)
+
+    async def _read_body(self, url, response):
+        declared = int(response.headers.get("Content-Length", 0) or 0)
+        result = FetchResult(url, response.status_code, response.headers, "binary",
+                             encoding=response.charset_encoding)
+        if declared > self.max_bytes:
+            return self._abort(result, f"declared size {declared} bytes over cap", declared)
+
+        body = bytearray()
+        stream = response.aiter_bytes()
+        async for chunk in stream:
+            body += chunk
+            if len(body) >= SNIFF_BYTES:
+                break
+        result.kind = sniff_kind(response.headers.get("Content-Type"), bytes(body[:SNIFF_BYTES]))
+        if result.kind == "binary":
+            return self._abort(result, "binary content", declared, len(body))
+
+        async for chunk in stream:
+            body += chunk
+            if len(body) > self.max_bytes:
+                return self._abort(result, f"body over {self.max_bytes} bytes", declared, len(body))
+
+        result.content = bytes(body)
+        self.stats["fetched"] += 1
+        self.stats["bytes_read"] += len(body)
+        return result
+
+    def _abort(self, result, reason, declared, bytes_read=0):
+        """
+        Marks the result as aborted. What was skipped is only known from Content-Length, so
+        chunked responses count as aborted_undeclared instead of adding to bytes_declared_skipped.
+        """
+        skipped = max(declared - bytes_read, 0)
+        result.aborted = reason
+        result.bytes_declared_skipped = skipped
+        self.stats["aborted"] += 1
+        self.stats["bytes_read"] += bytes_read
+        if declared:
+            self.stats["bytes_declared_skipped"] += skipped
+            print(f"Aborted download of {result.url}: {reason}, skipped {skipped} declared bytes")
+        else:
+            self.stats["aborted_undeclared"] += 1
+            print(f"Aborted download of {result.url}: {reason}, size not declared")
+        return result
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_engines = LoopBoundClients()
+
+
+def get_scrape_engine(cfg=None):
+    """
+    Gets the process-wide scrape engine, creating it on first use.
+    The engine is bound to the running event loop, so a new one is created (and the old one closed)
+    if the loop changes.
+    Args:
+        cfg: Config (optional)
+    Returns:
+        engine: ScrapeEngine
+    """
+    return _engines.get("engine", lambda: ScrapeEngine(
+        max_connections=cfg.scraper_max_connections if cfg else 20,
+        max_connections_per_host=cfg.scraper_max_connections_per_host if cfg else 4,
+        timeout=cfg.scraper_timeout if cfg else 10,
+        max_bytes=cfg.scraper_max_bytes if cfg else 10 * 1024 * 1024,
+    ))
@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Hosts not seen for this long are forgotten when the registry is saved
+FORGET_AFTER = 7 * 24 * 60 * 60
+
+
+def host_of(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class HostHealthRegistry:
+    """
+    Per-domain scrape health shared by every research run in the process.
+    Records latency, errors and "too short" pages per host and opens a circuit for hosts
+    that keep failing, so later sub-queries skip them for a cool-down window instead of
+    waiting out the timeout again. The registry is persisted to a JSON file.
+    """
+    def __init__(self, path=None, failure_threshold=3, cool_down=15 * 60, save_interval=30):
+        """
+        Args:
+            path: JSON file the registry is loaded from and saved to (optional)
+            failure_threshold: consecutive failures that open the circuit for a host
+            cool_down: seconds an open circuit stays open before one probe request is let through,
+                       and seconds the probe has to report before the circuit opens again
+            save_interval: minimum seconds between two saves triggered by maybe_save()
+        """
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.cool_down = cool_down
+        self.save_interval = save_interval
+        self.hosts = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.load()
+
+    def _entry(self, host):
+        entry = self.hosts.get(host)
+        if entry is None:
+            entry = self.hosts[host] = {
+                "requests": 0,
+                "errors": 0,
+                "short": 0,
+                "latency": None,
+                "consecutive_failures": 0,
+                "state": CLOSED,
+                "opened_at": None,
+                "last_seen": time.time(),
+            }
+        return entry
+
+    def allow(self, url):
+        """
+        Checks whether the host of the url may be scraped now.
+        An open circuit past its cool-down lets a single probe through (half-open). A probe that
+        reports no outcome within the cool-down (e.g. the process died) counts as failed, so the
+        circuit opens again instead of staying half-open for good.
+        """
+        with self._lock:
+            entry = self.hosts.get(host_of(url))
+            if entry is None or entry["state"] == CLOSED:
+                return True
+            # opened_at is when the circuit last opened or let its probe through
+            if time.time() - entry["opened_at"] >= self.cool_down:
+                if entry["state"] == OPEN:
+                    entry["state"] = HALF_OPEN
+                    entry["opened_at"] = time.time()
+                    self._dirty = True
+                    return True
+                print(f"Probe of {host_of(url)} never reported, opening its circuit again")
+                entry["state"] = OPEN
+                entry["opened_at"] = time.time()
+                self._dirty = True
+            return False
+
+    def record(self, url, outcome, latency=None):
+        """
+        Records the outcome of scraping the url
+        Args:
+            url: scraped url
+            outcome: "ok", "error" or "short"
+            latency: seconds spent on the request (optional)
+        """
+        with self._lock:
+            entry = self._entry(host_of(url))
+            entry["requests"] += 1
+            entry["last_seen"] = time.time()
+            if latency is not None:
+                previous = entry["latency"]
+                entry["latency"] = latency if previous is None else 0.7 * previous + 0.3 * latency
+
+            if outcome == "ok":
+                entry["consecutive_failures"] = 0
+                entry["state"] = CLOSED
+                entry["opened_at"] = None
+            else:
+                entry["errors" if outcome == "error" else "short"] += 1
+                entry["consecutive_failures"] += 1
+                if entry["state"] == HALF_OPEN or entry["consecutive_failures"] >= self.failure_threshold:
+                    if entry["state"] != OPEN:
+                        print(f"Opening circuit for {host_of(url)} after {entry['consecutive_failures']} failures")
+                    entry["state"] = OPEN
+                    entry["opened_at"] = time.time()
+            self._dirty = True
+
+    def score(self, url):
+        """
+        Lower is healthier. Combines failure rate and latency so slow or flaky hosts are scraped last.
+        """
+        entry = self.hosts.get(host_of(url))
+        if entry is None or not entry["requests"]:
+            return 0.0
+        failure_rate = (entry["errors"] + entry["short"]) / entry["requests"]
+        return failure_rate + (entry["latency"] or 0.0) / 10
+
+    def order(self, urls):
+        """
+        Drops urls whose host circuit is open and sorts the rest healthiest first
+        Returns:
+            (allowed, skipped) lists of urls
+        """
+        allowed, skipped = [], []
+        for url in urls:
+            (allowed if self.allow(url) else skipped).append(url)
+        allowed.sort(key=self.score)
+        return allowed, skipped
+
+    def stats(self):
+        with self._lock:
+            return {host: dict(entry) for host, entry in self.hosts.items()}
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.hosts = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load host health registry {self.path}: {e}")
+            self.hosts = {}
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            cutoff = time.time() - FORGET_AFTER
+            self.hosts = {host: entry for host, entry in self.hosts.items() if entry["last_seen"] >= cutoff}
+            snapshot = json.dumps(self.hosts)
+            self._dirty = False
+            self._last_save = time.time()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(snapshot)
+        os.replace(tmp_path, self.path)
+
+    def maybe_save(self):
+        """Saves the registry if it changed and the last save is older than save_interval"""
+        if self._dirty and time.time() - self._last_save >= self.save_interval:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Could not save host health registry {self.path}: {e}")
+
+
+_registry = None
+
+
+def get_host_health(cfg=None):
+    """
+    Gets the process-wide host health registry, creating it on first use
+    Args:
+        cfg: Config (optional)
+    """
+    global _registry
+    if _registry is None:
+        _registry = HostHealthRegistry(
+            path=os.path.join(cfg.cache_dir if cfg else ".cache", "host_health.json"),
+            failure_threshold=cfg.host_failure_threshold if cfg else 3,
+            cool_down=cfg.host_cool_down if cfg else 15 * 60,
+        )
+    return _registry
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from reach_core.utils.cpu import available_cpus
+
+logger = logging.getLogger(__name__)
+
+# Extraction functions below run inside worker processes, so they take raw bytes
+# and only return plain strings.
+
+TEXT_TAGS = frozenset(("p", "h1", "h2", "h3", "h4", "h5"))
+SKIP_TAGS = frozenset(("script", "style"))
+
+# Line breaks (as str.splitlines sees them) and runs of two or more spaces separate phrases
+_PHRASE_SEPARATORS = re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]| {2,}")
+
+
+def normalize_text(raw_content):
+    """
+    Splits the text into stripped phrases on line breaks and double spaces and joins
+    the non-empty ones with newlines, in a single pass over the buffer
+    """
+    return "\n".join(filter(None, (phrase.strip() for phrase in _PHRASE_SEPARATORS.split(raw_content))))
+
+
+# Charset a page declares itself, looked for in its first bytes like browsers do
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*['\"]?\s*[a-z0-9_.:-]+", re.IGNORECASE)
+_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+
+def guess_encoding(content):
+    """
+    Encoding of an html page whose server declared none. libxml2 would read such a page as
+    latin-1, garbling utf-8 text. Pages declaring their own charset (BOM or meta tag) are left
+    to the parser, others are read as utf-8 if they decode as such and as windows-1252 otherwise,
+    as browsers do.
+    Returns:
+        encoding: str, or None if the page declares its own
+    """
+    if content.startswith(_BOMS) or _META_CHARSET.search(content[:4096]):
+        return None
+    try:
+        content.decode("utf-8")
+    except UnicodeDecodeError:
+        return "windows-1252"
+    return "utf-8"
+
+
+def parse_html_lxml(content, encoding=None):
+    """
+    Extracts the paragraph and header text of an html page with a single walk of the lxml tree.
+    Text inside p/h1-h5 (minus script and style) is streamed into one buffer and normalized once.
+    Args:
+        content: raw html bytes
+        encoding: encoding reported by the server (optional)
+    Returns:
+        text: str
+    """
+    from lxml import etree, html
+
+    encoding = encoding or guess_encoding(content)
+    # Dropping comments and processing instructions at parse time merges their tails
+    # into the surrounding text, so the walk below only ever sees elements
+    try:
+        parser = html.HTMLParser(encoding=encoding, remove_comments=True, remove_pis=True)
+    except LookupError:
+        parser = html.HTMLParser(remove_comments=True, remove_pis=True)
+    root = html.document_fromstring(content, parser=parser)
+
+    buffer = []
+    text_depth = 0
+    skip_depth = 0
+    for event, element in etree.iterwalk(root, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            if tag in SKIP_TAGS:
+                skip_depth += 1
+            elif tag in TEXT_TAGS:
+                text_depth += 1
+            if text_depth and not skip_depth and element.text:
+                buffer.append(element.text)
+        else:
+            if tag in SKIP_TAGS:
+                skip_depth -= 1
+            elif tag in TEXT_TAGS:
+                text_depth -= 1
+                if not text_depth:
+                    buffer.append("\n")
+            if text_depth and not skip_depth and element.tail:
+                buffer.append(element.tail)
+
+    return normalize_text("".join(buffer))
+
+
+def parse_html(content, encoding=None):
+    """
+    Extracts the paragraph and header text of an html page with BeautifulSoup.
+    Slower than parse_html_lxml, kept as the fallback for pages lxml cannot parse.
+    Args:
+        content: raw html bytes
+        encoding: encoding reported by the server (optional)
+    Returns:
+        text: str
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'lxml', from_encoding=encoding or guess_encoding(content))
+
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.extract()
+
+    raw_content = ""
+    for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5']):
+        raw_content += element.text + "\n"
+    return normalize_text(raw_content)
+
+
+def parse_html_fast(content, encoding=None):
+    """
+    Extracts the page text with parse_html_lxml, falling back to BeautifulSoup on parser errors
+    """
+    try:
+        return parse_html_lxml(content, encoding)
+    except Exception:
+        return parse_html(content, encoding)
+
+
+def parse_plain_text(content, encoding=None):
+    """
+    Decodes and normalizes a text/* body that is not html
+    """
+    return normalize_text(content.decode(encoding or "utf-8", errors="replace"))
+
+
+def parse_html_with_newspaper(url, content, encoding=None):
+    """
+    Extracts the article title and text of an already downloaded page with newspaper
+    Args:
+        url: page url
+        content: raw html bytes
+        encoding: encoding reported by the server (optional)
+    Returns:
+        text: str, empty if no article was found
+    """
+    from newspaper import Article
+
+    article = Article(url, language="en", memoize_articles=False, fetch_images=False)
+    article.download(input_html=content.decode(encoding or "utf-8", errors="replace"))
+    article.parse()
+
+    if not (article.title and article.text):
+        return ""
+    return f"{article.title} : {article.text}"
+
+
+def parse_pdf(content, encoding=None):
+    """
+    Extracts the text of every page of a pdf with PyMuPDF
+    Args:
+        content: raw pdf bytes
+        encoding: unused, accepted so all parsers share a signature
+    Returns:
+        text: str
+    """
+    import fitz
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+
+class ParsePool:
+    """
+    Process pool for CPU-bound page extraction.
+    Fetching stays on the event loop; the raw bytes are handed to worker processes so
+    parsing is not serialized on the GIL. Workers are spawned rather than forked from the
+    server, whose threads and open sockets would otherwise be copied into every worker.
+    """
+    def __init__(self, max_workers=None):
+        """
+        Args:
+            max_workers: number of worker processes, defaults to the CPUs available to the container
+        """
+        self.max_workers = max_workers or available_cpus()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, fn, *args):
+        """
+        Runs fn(*args) in a worker process.
+        If the pool breaks (e.g. a worker was OOM killed) the page gets an empty result: it is
+        likely the page that killed the worker, so it is not parsed again in the server process.
+        The pool is recreated for the pages that follow.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            logger.warning("Parse pool broken while running %s, dropping the page and restarting the pool",
+                           getattr(fn, "__name__", fn))
+            # Pages that were in flight on the same pool all fail: only the first one restarts it
+            if self._executor is executor:
+                self.shutdown()
+            return ""
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool = None
+
+
+def get_parse_pool(cfg=None):
+    """
+    Gets the process-wide parse pool, creating it on first use
+    Args:
+        cfg: Config (optional)
+    """
+    global _pool
+    if _pool is None:
+        _pool = ParsePool(cfg.scraper_parse_workers if cfg else None)
+    return _pool
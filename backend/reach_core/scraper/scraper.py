@@ -1,30 +1,53 @@
+import asyncio
 from concurrent.futures.thread import ThreadPoolExecutor
 from langchain.document_loaders import PyMuPDFLoader
 from langchain.retrievers import ArxivRetriever
 from youtube_transcript_api import YouTubeTranscriptApi
 from functools import partial
+import httpx
 import requests
-from bs4 import BeautifulSoup
 from newspaper import Article
 import re
+import time
 from urllib.parse import urlparse
 
+from .cache import ScrapeCache
+from .engine import get_scrape_engine
+from .parsing import (get_parse_pool, parse_html_fast, parse_html_with_newspaper, parse_pdf,
+                      parse_plain_text)
+
 class Scraper:
     """
     Scraper class to extract the content from the links
     """
-    def __init__(self, urls, user_agent, scraper):
+    def __init__(self, urls, user_agent, scraper, engine=None, cache=None, cadence="", parse_pool=None,
+                 host_health=None, skip_unhealthy=True):
         """
         Initialize the Scraper class.
         Args:
             urls:
+            engine: ScrapeEngine used by the async path (optional, defaults to the shared engine)
+            cache: ScrapeCache consulted by the async path (optional)
+            cadence: report cadence, decides how long cached pages stay fresh
+            parse_pool: ParsePool used by the async path (optional, defaults to the shared pool)
+            host_health: HostHealthRegistry used to skip failing hosts (optional)
+            skip_unhealthy: skip hosts whose circuit is open, False to scrape every url and only
+                            record the outcomes, e.g. for urls the user asked for
         """
         self.urls = urls
+        self.user_agent = user_agent
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": user_agent
         })
         self.scraper = scraper
+        self.engine = engine
+        self.cache = cache
+        self.cadence = cadence
+        self.parse_pool = parse_pool
+        self.host_health = host_health
+        self.skip_unhealthy = skip_unhealthy
+        self.unfinished = []
 
     def run(self):
         """
@@ -36,6 +59,54 @@ class Scraper:
         res = [content for content in contents if content['raw_content'] is not None]
         return res
 
+    async def arun(self, deadline=None, target=None):
+        """
+        Extracts the content from the links without blocking the event loop
+        Args:
+            deadline: seconds after which pages still in flight are abandoned (optional)
+            target: stop once this many pages with content have arrived (optional)
+        """
+        return [content async for content in self.astream(deadline, target)]
+
+    async def astream(self, deadline=None, target=None):
+        """
+        Yields the content of the links as soon as each one has been scraped.
+        With a deadline or a target the stragglers are cancelled, so callers can hedge by
+        passing more links than they need. Links that never finished are left in self.unfinished.
+        Args:
+            deadline: seconds after which pages still in flight are abandoned (optional)
+            target: stop once this many pages with content have arrived (optional)
+        """
+        if self.engine is None:
+            self.engine = get_scrape_engine()
+        if self.parse_pool is None:
+            self.parse_pool = get_parse_pool()
+        urls = self.urls
+        if self.host_health and self.skip_unhealthy:
+            urls, skipped = self.host_health.order(urls)
+            for url in skipped:
+                print(f"Skipping {url}: circuit open for its host")
+        tasks = {asyncio.create_task(self.aextract_data_from_link(url)): url for url in urls}
+        yielded = 0
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=deadline or None):
+                content = await next_done
+                if content['raw_content'] is not None:
+                    yield content
+                    yielded += 1
+                    if target and yielded >= target:
+                        break
+        except TimeoutError:
+            print(f"Scrape deadline of {deadline}s reached with {yielded} pages")
+        finally:
+            self.unfinished = [url for task, url in tasks.items() if not task.done()]
+            for task in tasks:
+                task.cancel()
+            if self.unfinished:
+                print(f"Cancelled {len(self.unfinished)} unfinished scrapes")
+            if self.host_health:
+                self.host_health.maybe_save()
+
     def is_valid_url(self, url):
         """
         Check if the URL is valid.
@@ -80,6 +151,59 @@ class Scraper:
             print(f"Error scraping {link}: {str(e)}")
         return {'url': link, 'raw_content': None}
 
+    async def aextract_data_from_link(self, link):
+        """
+        Extracts the data from the link using the shared async engine.
+        Downloaded pages are parsed in the parse pool, other blocking extractors run in threads.
+        """
+        content = ""
+        validators = {}
+        started = time.monotonic()
+        try:
+            if not self.is_valid_url(link):
+                print(f"Invalid URL: {link}")
+                return {'url': link, 'raw_content': None}
+
+            # The cache is SQLite on disk: its queries run in a thread, off the event loop
+            cached = await asyncio.to_thread(self.cache.lookup, link, self.cadence) if self.cache else None
+            if cached and cached["fresh"]:
+                print(f"Scrape cache hit for {link}")
+                return {'url': link, 'raw_content': cached["content"]}
+
+            if "arxiv.org" in link and not link.endswith(".pdf"):
+                doc_num = link.split("/")[-1]
+                content = await asyncio.to_thread(self.scrape_pdf_with_arxiv, doc_num)
+            elif "youtube.com" in link or "youtu.be" in link:
+                content = await asyncio.to_thread(self.scrape_youtube_transcripts, link)
+            else:
+                content, validators = await self.afetch_and_parse(link, cached)
+
+            print(f"Scraped content length for {link}: {len(content)}")
+
+            if len(content) < 100:
+                print(f"Content too short for {link}")
+                self._record_health(link, "short", started)
+                return {'url': link, 'raw_content': None}
+            self._record_health(link, "ok", started)
+            if self.cache and validators is not None:
+                await asyncio.to_thread(self.cache.save, link, content, **validators)
+            return {'url': link, 'raw_content': content}
+        except httpx.HTTPError as e:
+            print(f"Network error while scraping {link}: {str(e)}")
+            self._record_health(link, "error", started)
+        except asyncio.CancelledError:
+            # Cancelled by the deadline or target: a half-open host must still hear about its probe
+            self._record_health(link, "error", started)
+            raise
+        except Exception as e:
+            print(f"Error scraping {link}: {str(e)}")
+            self._record_health(link, "error", started)
+        return {'url': link, 'raw_content': None}
+
+    def _record_health(self, link, outcome, started):
+        if self.host_health:
+            self.host_health.record(link, outcome, time.monotonic() - started)
+
     def scrape_youtube_transcripts(self, url: str) -> str:
         """Scrape transcript from a Youtube video url"""
         video_id = re.search(r'(?:v=|\/)([0-9A-Za-z_-]{11}).*', url)
@@ -98,19 +222,57 @@ class Scraper:
         try:
             response = session.get(link, timeout=10)
             response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'lxml', from_encoding=response.encoding)
-
-            for script_or_style in soup(["script", "style"]):
-                script_or_style.extract()
-
-            raw_content = self.get_content_from_url(soup)
-            lines = (line.strip() for line in raw_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            return "\n".join(chunk for chunk in chunks if chunk)
+            return self.extract_text_from_html(response.content, response.encoding)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching {link}: {str(e)}")
             return ""
 
+    async def afetch_and_parse(self, link, cached=None):
+        """
+        Streams the link on the shared engine, routes the body to an extractor by its sniffed
+        kind (pdf, html or text) and runs the extraction in the parse pool.
+        A stale cache entry is revalidated with a conditional GET. Network errors are raised.
+        Args:
+            link: url to scrape
+            cached: stale cache entry for the link (optional)
+        Returns:
+            (content, validators) where validators is None if the cached entry was still valid
+        """
+        headers = {"User-Agent": self.user_agent}
+        headers.update(ScrapeCache.conditional_headers(cached))
+        result = await self.engine.fetch(link, headers=headers)
+
+        if result.kind == "not_modified":
+            if cached:
+                print(f"Scrape cache revalidated for {link}")
+                await asyncio.to_thread(self.cache.revalidated, link)
+                return cached["content"], None
+            # 304 without a body to fall back on: fetch the page unconditionally
+            result = await self.engine.fetch(link, headers={"User-Agent": self.user_agent})
+            if result.kind == "not_modified":
+                return "", {}
+        if result.aborted:
+            return "", {}
+
+        if result.kind == "pdf":
+            parse = parse_pdf
+        elif result.kind == "text":
+            parse = parse_plain_text
+        elif self.scraper == "bs":
+            parse = parse_html_fast
+        else:
+            parse = partial(parse_html_with_newspaper, link)
+
+        validators = {
+            "etag": result.headers.get("ETag"),
+            "last_modified": result.headers.get("Last-Modified"),
+        }
+        content = await self.parse_pool.run(parse, result.content, result.encoding)
+        return content, validators
+
+    def extract_text_from_html(self, content, encoding=None):
+        return parse_html_fast(content, encoding)
+
     def scrape_url_with_newspaper(self, url) -> str:
         try:
             article = Article(url, language="en", memoize_articles=False, fetch_images=False)
@@ -146,10 +308,3 @@ class Scraper:
         except Exception as e:
             print(f"Error scraping arXiv PDF for query {query}: {str(e)}")
             return ""
-
-    def get_content_from_url(self, soup):
-        text = ""
-        tags = ['p', 'h1', 'h2', 'h3', 'h4', 'h5']
-        for element in soup.find_all(tags):
-            text += element.text + "\n"
-        return text
\ No newline at end of file
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+
+class CacheStats:
+    """Hit/miss counters shared by the cache tiers"""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class LRUCache:
+    """
+    In-memory LRU cache with optional per-entry expiry
+    """
+    def __init__(self, max_entries=1024, ttl=None):
+        """
+        Args:
+            max_entries: number of entries kept before the least recently used one is evicted
+            ttl: default time to live in seconds, None for no expiry
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return value
+                del self._entries[key]
+            self.stats.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.time())
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """
+    Persistent key/value cache backed by a single SQLite file.
+    Values are bytes and are zlib-compressed on disk.
+    """
+    def __init__(self, path, max_entries=None):
+        """
+        Args:
+            path: path of the SQLite file, parent directories are created if needed
+            max_entries: if set, the oldest entries beyond this count are removed by prune()
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, stored_at REAL NOT NULL, expires_at REAL)"
+        )
+
+    def get(self, key):
+        """
+        Returns:
+            (value, stored_at) or None if the key is missing or expired
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """
+        Looks up several keys in one query
+        Returns:
+            dict of key -> (value, stored_at) for the keys that were found
+        """
+        keys = list(keys)
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, value, stored_at, expires_at FROM cache WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, value, stored_at, expires_at in rows:
+                    if expires_at is None or expires_at > now:
+                        found[key] = (zlib.decompress(value), stored_at)
+        self.stats.hits += len(found)
+        self.stats.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key, value, ttl=None):
+        self.set_many({key: value}, ttl)
+
+    def set_many(self, items, ttl=None):
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        rows = [(key, zlib.compress(value), now, expires_at) for key, value in items.items()]
+        with self._lock:
+            # One transaction for the whole batch instead of one commit per row
+            with self._conn:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+
+    def touch(self, key):
+        """Marks an entry as freshly stored without rewriting its value"""
+        with self._lock:
+            self._conn.execute("UPDATE cache SET stored_at = ? WHERE key = ?", (time.time(), key))
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def prune(self):
+        """Removes expired entries and, if max_entries is set, the oldest overflow"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+            removed = cursor.rowcount
+            if self.max_entries:
+                cursor = self._conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    "SELECT key FROM cache ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                removed += cursor.rowcount
+        self.stats.evictions += removed
+        return removed
@@ -0,0 +1,58 @@
+import asyncio
+
+# Close tasks of stale clients, referenced until they finish so they are not garbage collected
+_closing = set()
+
+
+async def _aclose(client):
+    try:
+        await client.aclose()
+    except RuntimeError:
+        # The old loop is closed: its transports cannot be unregistered, but the sockets are closed by now
+        pass
+    except Exception as e:
+        print(f"Error closing stale client {type(client).__name__}: {e}")
+
+
+def close_client(client, loop=None):
+    """
+    Closes an async client created on another event loop, without waiting for it.
+    The close runs on that loop if it is still running, in another thread, and on the running loop otherwise.
+    Args:
+        client: object with an async aclose() method
+        loop: event loop the client was created on (optional)
+    """
+    if loop is not None and loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(_aclose(client), loop)
+        return
+    task = asyncio.get_running_loop().create_task(_aclose(client))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+class LoopBoundClients:
+    """
+    Process-wide async clients (HTTP clients, engines) bound to the running event loop.
+    Clients hold connection pools that only work on the loop they were created on, so a new one is
+    created when the loop changes, and the clients of the previous loop are closed instead of leaked.
+    """
+    def __init__(self):
+        self._clients = {}
+        self._loop = None
+
+    def get(self, key, create):
+        """
+        Gets the client of key for the running event loop
+        Args:
+            key: identifies the client, e.g. the server url
+            create: function returning a new client, called on first use on this loop
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            stale, stale_loop = self._clients.values(), self._loop
+            self._clients, self._loop = {}, loop
+            for client in stale:
+                close_client(client, stale_loop)
+        if key not in self._clients:
+            self._clients[key] = create()
+        return self._clients[key]
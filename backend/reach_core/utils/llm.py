@@ -3,15 +3,18 @@ from __future__ import annotations
 import json
 import logging
 import asyncio
-from typing import Optional
+from typing import Callable, Optional
 
 from colorama import Fore, Style
 from fastapi import WebSocket
 from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 
 from reach_core.master.prompts import auto_agent_instructions, generate_subtopics_prompt
+from reach_core.runtime import get_runtime
+from reach_core.utils.llm_cache import get_llm_cache
+from reach_core.utils.retry import StreamSink, get_retry_policy, resume_messages
+from reach_core.utils.scheduler import estimate_tokens, get_llm_scheduler
 
 from .validators import Subtopics
 
@@ -39,6 +42,9 @@ async def create_chat_completion(
     llm_provider: Optional[str] = None,
     stream: Optional[bool] = False,
     websocket: WebSocket | None = None,
+    fallback_model: Optional[str] = None,
+    cache: bool = True,
+    validate: Optional[Callable[[str], object]] = None,
 ) -> str:
     """Create a chat completion using the OpenAI API
     Args:
@@ -49,6 +55,9 @@ async def create_chat_completion(
         stream (bool, optional): Whether to stream the response. Defaults to False.
         llm_provider (str, optional): The LLM Provider to use.
         webocket (WebSocket): The websocket used in the currect request
+        fallback_model (str, optional): Model used once the model keeps failing. Defaults to FALLBACK_LLM_MODEL.
+        cache (bool, optional): Whether a temperature 0, non-streamed response may be served from and stored in the LLM cache. Defaults to True.
+        validate (Callable, optional): Parser the caller will apply to the response, e.g. json.loads. A response it raises on is not cached, and a cached one is evicted and asked again.
     Returns:
         str: The response from the chat completion
     """
@@ -58,28 +67,51 @@ async def create_chat_completion(
     if max_tokens is not None and max_tokens > 8001:
         raise ValueError(
             f"Max tokens cannot be more than 8001, but got {max_tokens}")
-    # Get the provider from supported providers
-    ProviderClass = get_provider(llm_provider)
-    provider = ProviderClass(
-        model,
-        temperature,
-        max_tokens
+    runtime = get_runtime()
+    # Deterministic planning calls are answered from the cache when the same prompt was sent today
+    llm_cache = get_llm_cache(runtime.cfg) if cache and temperature == 0 and not stream else None
+    cache_model = f"{llm_provider}:{model}"
+    if llm_cache is not None:
+        cached = llm_cache.get(cache_model, messages, max_tokens)
+        if cached is not None:
+            if _is_valid(cached, validate):
+                return cached
+            llm_cache.delete(cache_model, messages, max_tokens)
+
+    # A streamed response that breaks off is resumed after the text the websocket already received
+    sink = StreamSink(websocket) if stream else None
+    # Model of the last attempt, which is the one that answered once the policy returns
+    answered_by = [model]
+
+    async def call(current_model, delivered):
+        answered_by[0] = current_model
+        # Providers are cached by the runtime, so their HTTP connections are reused across calls
+        provider = runtime.llm(llm_provider, current_model, temperature, max_tokens)
+        attempt_messages = resume_messages(messages, delivered) if delivered else messages
+        # Every attempt queues for the model's rate limits and adaptive concurrency
+        tokens = estimate_tokens(attempt_messages, max_tokens, current_model)
+        async with get_llm_scheduler(runtime.cfg).slot(current_model, tokens, measure_latency=not stream):
+            return await provider.get_chat_response(attempt_messages, stream, sink)
+
+    response = await get_retry_policy(runtime.cfg).run(
+        call, model, fallback_model=fallback_model or runtime.cfg.fallback_llm_model, sink=sink
     )
-    # create response
-    for _ in range(10):  # maximum of 10 attempts
-        if llm_provider == "openai":
-            response = await provider.get_chat_response(
-                messages, stream, websocket
-            )
-        else:
-            model_response = await provider.get_chat_response(
-                messages, stream, websocket
-            )
-            response = model_response.choices[0].message['content']
-        return response
-    logging.error("Failed to get response from OpenAI API")
-    raise RuntimeError("Failed to get response from OpenAI API")
-    
+    # After a failover the response is the fallback model's, so it is cached under that model
+    if llm_cache is not None and _is_valid(response, validate):
+        llm_cache.set(f"{llm_provider}:{answered_by[0]}", messages, response, max_tokens)
+    return response
+
+
+def _is_valid(response, validate):
+    if validate is None:
+        return True
+    try:
+        validate(response)
+    except Exception:
+        return False
+    return True
+
+
 def choose_agent(smart_llm_model: str, llm_provider: str, task: str) -> dict:
     """Determines what server should be used
     Args:
@@ -119,7 +151,7 @@ async def construct_subtopics(task: str, data: str, config, subtopics: list = []
                 "format_instructions": parser.get_format_instructions()},
         )
 
-        model = ChatOpenAI(model=config.smart_llm_model)
+        model = get_runtime().chat_model(config.smart_llm_model)
 
         chain = prompt | model | parser
 
@@ -0,0 +1,131 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import time
+
+from reach_core.utils.cache import DiskCache, LRUCache
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_messages(messages):
+    """
+    Reduces chat messages to (role, content) pairs with whitespace collapsed, so prompts that
+    only differ in indentation or line breaks share a cache entry
+    """
+    normalized = []
+    for message in messages:
+        if isinstance(message, dict):
+            role, content = message.get("role", ""), message.get("content", "")
+        else:
+            role, content = getattr(message, "type", ""), getattr(message, "content", message)
+        normalized.append((str(role), _SPACES.sub(" ", str(content)).strip()))
+    return normalized
+
+
+def seconds_until_midnight(now=None):
+    now = now or datetime.datetime.now()
+    midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+    return (midnight - now).total_seconds()
+
+
+class LLMResponseCache:
+    """
+    Exact-match cache of deterministic chat completions keyed by hash(model, normalized messages, date).
+    Prompts embed today's date, so entries are bucketed by day and expire at midnight at the latest.
+    Responses are kept in an in-memory LRU and optionally in a disk tier shared across restarts.
+    """
+    def __init__(self, max_entries=1024, disk_path=None, ttl=24 * 60 * 60):
+        """
+        Args:
+            max_entries: responses kept in memory before the least recently used one is evicted
+            disk_path: SQLite file of the disk tier (optional)
+            ttl: maximum seconds a response is served from the cache
+        """
+        self.memory = LRUCache(max_entries)
+        self.disk = DiskCache(disk_path) if disk_path else None
+        self.ttl = ttl
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @staticmethod
+    def key(model, messages, max_tokens=None):
+        payload = json.dumps(
+            [model, max_tokens, datetime.date.today().isoformat(), normalize_messages(messages)],
+            ensure_ascii=False,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, model, messages, max_tokens=None):
+        """
+        Returns:
+            the cached response text, or None on a miss
+        """
+        key = self.key(model, messages, max_tokens)
+        response = self.memory.get(key)
+        if response is not None:
+            self.stats["memory_hits"] += 1
+            return response
+
+        if self.disk:
+            found = self.disk.get(key)
+            if found is not None:
+                response = found[0].decode("utf-8")
+                remaining = self.ttl - (time.time() - found[1])
+                self.memory.set(key, response, ttl=min(remaining, seconds_until_midnight()))
+                self.stats["disk_hits"] += 1
+                return response
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, model, messages, response, max_tokens=None):
+        if not isinstance(response, str) or not response:
+            return
+        key = self.key(model, messages, max_tokens)
+        ttl = min(self.ttl, seconds_until_midnight())
+        self.memory.set(key, response, ttl=ttl)
+        if self.disk:
+            self.disk.set(key, response.encode("utf-8"), ttl=ttl)
+
+    def delete(self, model, messages, max_tokens=None):
+        """Evicts a response, e.g. one its caller could not parse"""
+        key = self.key(model, messages, max_tokens)
+        self.memory.delete(key)
+        if self.disk:
+            self.disk.delete(key)
+
+    def metrics(self):
+        lookups = sum(self.stats.values())
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "evictions": self.memory.stats.evictions,
+        }
+
+
+_cache = None
+
+
+def get_llm_cache(cfg=None):
+    """
+    Gets the process-wide LLM response cache, or None if caching is disabled
+    Args:
+        cfg: Config (optional)
+    """
+    global _cache
+    if cfg is not None and not cfg.llm_cache_enabled:
+        return None
+    if _cache is None:
+        disk_path = None
+        if cfg is None or cfg.llm_cache_disk:
+            disk_path = os.path.join(cfg.cache_dir if cfg else ".cache", "llm.sqlite")
+        _cache = LLMResponseCache(
+            max_entries=cfg.llm_cache_max_entries if cfg else 1024,
+            disk_path=disk_path,
+            ttl=cfg.llm_cache_ttl if cfg else 24 * 60 * 60,
+        )
+    return _cache
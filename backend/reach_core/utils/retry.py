@@ -0,0 +1,252 @@
+import asyncio
+import email.utils
+import random
+import re
+import threading
+import time
+from collections import deque
+
+import httpx
+from colorama import Fore, Style
+
+# Statuses worth another attempt: timeouts, conflicts, rate limits and server errors
+RETRY_STATUSES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+TRANSIENT_ERRORS = (asyncio.TimeoutError, ConnectionError, httpx.TransportError)
+try:
+    import openai
+    TRANSIENT_ERRORS += (openai.APIConnectionError,)
+except ImportError:
+    pass
+
+# OpenAI rate-limit reset headers look like "20ms", "1s" or "6m0.5s"
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+RESUME_PROMPT = (
+    "Your previous answer was cut off. Continue it exactly where it stopped, "
+    "without repeating any text that was already written."
+)
+
+
+def status_of(error):
+    """Gets the HTTP status of an API error, or None"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error):
+    return isinstance(error, TRANSIENT_ERRORS) or status_of(error) in RETRY_STATUSES
+
+
+def _parse_duration(value):
+    matches = _DURATION.findall(value)
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+def retry_after(error):
+    """
+    Reads how long the server asked us to wait from the response headers of an API error
+    Returns:
+        seconds, or None if the response carries no hint
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                date = email.utils.parsedate_to_datetime(value)
+                return max(date.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        pass
+    resets = [
+        _parse_duration(headers[name])
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(name)
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+class ErrorBudget:
+    """
+    Per-model sliding window of failed LLM calls.
+    A model that used up its budget is skipped in favour of the fallback model until
+    its failures age out of the window.
+    """
+    def __init__(self, max_errors=10, window=60):
+        """
+        Args:
+            max_errors: failures allowed per model within the window
+            window: seconds a failure counts against the budget
+        """
+        self.max_errors = max_errors
+        self.window = window
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def _prune(self, model, now):
+        failures = self.failures.get(model)
+        while failures and now - failures[0] > self.window:
+            failures.popleft()
+        return failures
+
+    def exhausted(self, model):
+        with self._lock:
+            failures = self._prune(model, time.monotonic())
+            return bool(failures) and len(failures) >= self.max_errors
+
+    def record_failure(self, model):
+        with self._lock:
+            now = time.monotonic()
+            self._prune(model, now)
+            self.failures.setdefault(model, deque()).append(now)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            return {model: len(self._prune(model, now) or ()) for model in list(self.failures)}
+
+
+class StreamSink:
+    """
+    Websocket stand-in handed to a streaming provider. Forwards every message and remembers the
+    report text actually delivered, so a retried stream can continue after it instead of
+    sending it again.
+    """
+    def __init__(self, websocket=None):
+        self.websocket = websocket
+        self.delivered = ""
+
+    async def send_json(self, data):
+        if self.websocket is not None:
+            await self.websocket.send_json(data)
+        else:
+            print(f"{Fore.GREEN}{data.get('output', '')}{Style.RESET_ALL}")
+        if data.get("type") == "report":
+            self.delivered += data.get("output", "")
+
+
+def resume_messages(messages, delivered):
+    """
+    Extends the messages so the model continues a response of which `delivered` was already sent
+    """
+    return list(messages) + [
+        {"role": "assistant", "content": delivered},
+        {"role": "user", "content": RESUME_PROMPT},
+    ]
+
+
+class RetryPolicy:
+    """
+    Retries LLM calls on rate limits and transient errors with exponential backoff and full jitter,
+    waits as long as the server asks through Retry-After and rate-limit headers, and fails over
+    to a fallback model once the attempts or the model's error budget are used up.
+    """
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=60.0, budget=None):
+        """
+        Args:
+            max_attempts: attempts per model
+            base_delay: seconds before the first retry, doubled for every further retry
+            max_delay: longest wait between two attempts; a server asking for more triggers the failover
+            budget: ErrorBudget shared by the calls of the process (optional)
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget if budget is not None else ErrorBudget()
+        self.stats = {"calls": 0, "retries": 0, "failovers": 0, "resumed": 0, "failures": 0}
+
+    def delay(self, attempt, error):
+        """
+        Seconds to wait before retrying after the attempt-th failure, or None if the server
+        asks for longer than max_delay
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        hint = retry_after(error)
+        if hint is None:
+            return backoff
+        if hint > self.max_delay:
+            return None
+        # A little jitter on top of the hint keeps callers limited together from retrying together
+        return hint + random.uniform(0, self.base_delay)
+
+    async def run(self, call, model, fallback_model=None, sink=None):
+        """
+        Runs an LLM call with retries and failover
+        Args:
+            call: coroutine function call(model, delivered) returning the response text;
+                  delivered is the streamed text already sent, which the call should continue
+            model: model tried first
+            fallback_model: model used once the first one keeps failing (optional)
+            sink: StreamSink of a streamed call (optional)
+        Returns:
+            the complete response text
+        """
+        self.stats["calls"] += 1
+        models = [model] + ([fallback_model] if fallback_model and fallback_model != model else [])
+        error = None
+        for position, current in enumerate(models):
+            is_last = position == len(models) - 1
+            if not is_last and self.budget.exhausted(current):
+                print(f"Error budget of {current} is used up, failing over to {models[position + 1]}")
+                self.stats["failovers"] += 1
+                continue
+            for attempt in range(self.max_attempts):
+                delivered = sink.delivered if sink is not None else ""
+                if delivered:
+                    self.stats["resumed"] += 1
+                try:
+                    return delivered + await call(current, delivered)
+                except Exception as e:
+                    if not is_retryable(e):
+                        self.stats["failures"] += 1
+                        raise
+                    error = e
+                    self.budget.record_failure(current)
+
+                wait = self.delay(attempt, error)
+                if attempt == self.max_attempts - 1 or wait is None or (not is_last and self.budget.exhausted(current)):
+                    break
+                self.stats["retries"] += 1
+                print(f"LLM call to {current} failed ({type(error).__name__}, status {status_of(error)}), "
+                      f"retrying in {wait:.1f}s")
+                await asyncio.sleep(wait)
+            if not is_last:
+                print(f"LLM calls to {current} keep failing, failing over to {models[position + 1]}")
+                self.stats["failovers"] += 1
+        self.stats["failures"] += 1
+        raise error
+
+
+_policy = None
+
+
+def get_retry_policy(cfg=None):
+    """
+    Gets the process-wide LLM retry policy, whose error budget is shared by every call
+    Args:
+        cfg: Config (optional)
+    """
+    global _policy
+    if _policy is None:
+        _policy = RetryPolicy(
+            max_attempts=cfg.llm_max_attempts if cfg else 5,
+            base_delay=cfg.llm_retry_base_delay if cfg else 1.0,
+            max_delay=cfg.llm_retry_max_delay if cfg else 60.0,
+            budget=ErrorBudget(
+                max_errors=cfg.llm_error_budget if cfg else 10,
+                window=cfg.llm_error_budget_window if cfg else 60,
+            ),
+        )
+    return _policy
@@ -0,0 +1,285 @@
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from reach_core.utils.retry import retry_after, status_of
+from reach_core.utils.tokens import count_tokens
+
+# Session the LLM calls of the current task are queued under; set once per websocket run or request
+current_session = contextvars.ContextVar("llm_session", default=None)
+
+# Completion tokens assumed for a call without max_tokens when reserving tokens-per-minute
+DEFAULT_COMPLETION_TOKENS = 1000
+
+
+def estimate_tokens(messages, max_tokens=None, model=None):
+    """Tokens a chat call counts against the tokens-per-minute limit: the prompt plus the completion"""
+    prompt = sum(
+        count_tokens(str(message.get("content", "") if isinstance(message, dict) else message), model)
+        for message in messages
+    )
+    return prompt + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate, holding at most one minute of tokens
+    """
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until amount tokens are available; requests larger than the bucket wait for a full one"""
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def penalize(self, seconds):
+        """Empties the bucket for the given seconds, e.g. after the provider answered 429"""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class ModelScheduler:
+    """
+    Admission control for the calls of one model.
+    Calls wait until the requests-per-minute and tokens-per-minute buckets allow them and a
+    concurrency slot is free. The concurrency limit adapts with AIMD: it grows by one per window
+    of successful calls, and is halved on a 429 or cut when latency rises well above its baseline.
+    Waiting calls are queued per session and admitted round-robin, so one large run cannot starve
+    the others.
+    """
+    def __init__(self, model, rpm=0, tpm=0, initial_concurrency=8, max_concurrency=32, min_concurrency=1,
+                 latency_factor=3.0):
+        """
+        Args:
+            model: model name
+            rpm: requests per minute, 0 for no limit
+            tpm: tokens per minute, 0 for no limit
+            initial_concurrency: calls in flight at start
+            max_concurrency: upper bound of the adaptive limit
+            min_concurrency: lower bound of the adaptive limit
+            latency_factor: latency above this multiple of the baseline counts as congestion
+        """
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.limit = float(initial_concurrency)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_factor = latency_factor
+        self.baseline = None
+        self.active = 0
+        self.queues = OrderedDict()
+        self.stats = {"calls": 0, "rate_limited": 0, "decreases": 0, "wait_total": 0.0, "wait_max": 0.0}
+        self._timer = None
+
+    @property
+    def queue_depth(self):
+        return sum(len(waiters) for waiters in self.queues.values())
+
+    async def acquire(self, session=None, tokens=0):
+        """Waits until the call may be sent"""
+        future = asyncio.get_running_loop().create_future()
+        waiter = (future, tokens, time.monotonic())
+        self.queues.setdefault(session, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just before the caller was cancelled: hand the slot back
+                self.release()
+            else:
+                self._remove(session, waiter)
+            raise
+
+    def _remove(self, session, waiter):
+        waiters = self.queues.get(session)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self.queues[session]
+
+    def _dispatch(self):
+        while self.queues and self.active < int(self.limit):
+            session, waiters = next(iter(self.queues.items()))
+            future, tokens, queued_at = waiters[0]
+            if future.done():
+                self._remove(session, waiters[0])
+                continue
+            wait = max(
+                self.requests.wait_time(1) if self.requests else 0.0,
+                self.tokens.wait_time(tokens) if self.tokens else 0.0,
+            )
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._wake)
+                return
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            waiters.popleft()
+            # The session goes to the back of the line, whether it has more calls waiting or not
+            if waiters:
+                self.queues.move_to_end(session)
+            else:
+                del self.queues[session]
+            waited = time.monotonic() - queued_at
+            self.stats["calls"] += 1
+            self.stats["wait_total"] += waited
+            self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+            self.active += 1
+            future.set_result(None)
+
+    def _wake(self):
+        self._timer = None
+        self._dispatch()
+
+    def release(self, latency=None, rate_limited=False, wait=None):
+        """
+        Frees the slot of a finished call and adapts the concurrency limit
+        Args:
+            latency: seconds the call took, None if it says nothing about congestion (streams, errors)
+            rate_limited: the provider answered 429
+            wait: seconds the provider asked to wait (optional)
+        """
+        self.active -= 1
+        if rate_limited:
+            self.stats["rate_limited"] += 1
+            self._decrease(0.5)
+            if wait and self.requests:
+                self.requests.penalize(wait)
+        elif latency is not None:
+            if self.baseline is None:
+                self.baseline = latency
+            if latency > self.latency_factor * self.baseline:
+                self._decrease(0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            # The baseline follows the latency slowly, so a burst of slow calls still reads as congestion
+            self.baseline = 0.95 * self.baseline + 0.05 * latency
+        self._dispatch()
+
+    def _decrease(self, factor):
+        self.limit = max(self.min_concurrency, self.limit * factor)
+        self.stats["decreases"] += 1
+
+    def metrics(self):
+        calls = self.stats["calls"]
+        return {
+            "queue_depth": self.queue_depth,
+            "sessions_waiting": len(self.queues),
+            "active": self.active,
+            "concurrency_limit": round(self.limit, 2),
+            "latency_baseline": round(self.baseline, 3) if self.baseline is not None else None,
+            "calls": calls,
+            "rate_limited": self.stats["rate_limited"],
+            "decreases": self.stats["decreases"],
+            "wait_avg": round(self.stats["wait_total"] / calls, 3) if calls else 0.0,
+            "wait_max": round(self.stats["wait_max"], 3),
+        }
+
+
+class LLMScheduler:
+    """
+    Process-wide scheduler of LLM calls, with one ModelScheduler per model.
+    Research runs and server endpoints send every call through slot(), so they share the
+    provider's rate limits instead of discovering them independently through 429s.
+    """
+    def __init__(self, rpm=0, tpm=0, initial_concurrency=8, max_concurrency=32):
+        """
+        Args:
+            rpm: requests per minute per model, 0 for no limit
+            tpm: tokens per minute per model, 0 for no limit
+            initial_concurrency: calls in flight per model at start
+            max_concurrency: upper bound of the adaptive per-model limit
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.models = {}
+
+    def model(self, model):
+        if model not in self.models:
+            self.models[model] = ModelScheduler(
+                model,
+                rpm=self.rpm,
+                tpm=self.tpm,
+                initial_concurrency=min(self.initial_concurrency, self.max_concurrency),
+                max_concurrency=self.max_concurrency,
+            )
+        return self.models[model]
+
+    @asynccontextmanager
+    async def slot(self, model, tokens=0, session=None, measure_latency=True):
+        """
+        Holds a slot of the model for the duration of one call
+        Args:
+            model: model called
+            tokens: tokens the call counts against tokens-per-minute, see estimate_tokens()
+            session: session the call is queued under, defaults to current_session
+            measure_latency: whether the call's duration says something about congestion
+                             (False for streams, whose duration depends on the output length)
+        """
+        scheduler = self.model(model)
+        await scheduler.acquire(session if session is not None else current_session.get(), tokens)
+        started = time.monotonic()
+        latency, rate_limited, wait = None, False, None
+        try:
+            yield
+            if measure_latency:
+                latency = time.monotonic() - started
+        except Exception as e:
+            rate_limited = status_of(e) == 429
+            wait = retry_after(e) if rate_limited else None
+            raise
+        finally:
+            scheduler.release(latency, rate_limited, wait)
+
+    def metrics(self):
+        return {model: scheduler.metrics() for model, scheduler in self.models.items()}
+
+
+_scheduler = None
+_scheduler_loop = None
+
+
+def get_llm_scheduler(cfg=None):
+    """
+    Gets the process-wide LLM scheduler, bound to the running event loop
+    Args:
+        cfg: Config (optional)
+    """
+    global _scheduler, _scheduler_loop
+    loop = asyncio.get_running_loop()
+    if _scheduler is None or _scheduler_loop is not loop:
+        _scheduler = LLMScheduler(
+            rpm=cfg.llm_rpm if cfg else 0,
+            tpm=cfg.llm_tpm if cfg else 0,
+            initial_concurrency=cfg.llm_initial_concurrency if cfg else 8,
+            max_concurrency=cfg.llm_max_concurrency if cfg else 32,
+        )
+        _scheduler_loop = loop
+    return _scheduler
+
+
+def llm_metrics():
+    """Metrics of the scheduler of the running process, empty before the first call"""
+    return _scheduler.metrics() if _scheduler is not None else {}
@@ -0,0 +1,43 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model=None):
+    """
+    Gets the tiktoken encoding for the model, or None if tiktoken is not installed or its
+    vocabulary cannot be loaded (it is downloaded on first use). Unknown models fall back to cl100k_base.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"Could not load tokenizer for {model}, estimating token counts: {e}")
+        return None
+
+
+def warm_encodings(models=()):
+    """
+    Loads the encodings of the models (and the default one) ahead of the first count, which would
+    otherwise read or download the vocabulary. Blocking, call it from a thread.
+    """
+    for model in dict.fromkeys((None, *models)):
+        get_encoding(model)
+
+
+def count_tokens(text, model=None):
+    """
+    Counts the tokens of the text with the model's tokenizer.
+    Falls back to the usual 4 characters per token estimate without tiktoken.
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
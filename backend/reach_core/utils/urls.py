@@ -0,0 +1,227 @@
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters set by ad and analytics platforms to track the visitor; they never change the page content
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "gbraid", "wbraid", "dclid", "msclkid", "yclid", "twclid", "ttclid", "igshid",
+    "li_fat_id", "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "vero_id", "wt.mc_id",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_")
+
+_HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+_AMP_SUFFIX = re.compile(r"(?:/amp|\.amp|/amp\.html)$", re.IGNORECASE)
+_SLASHES = re.compile(r"/{2,}")
+
+
+def canonicalize_url(url):
+    """
+    Canonicalizes a url without changing the resource it points to, so it can key cached pages.
+    Lowercases the scheme and host and drops the fragment, default ports and tracking parameters,
+    and sorts the query. The scheme, host and path are otherwise kept as they are.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and str(parts.port) != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(sorted(query)), ""))
+
+
+def dedup_key(url):
+    """
+    Looser form of canonicalize_url used to spot variants of the same page within a run.
+    Also treats http and https alike and drops www./m./amp./mobile. host prefixes, AMP path
+    suffixes, repeated and trailing slashes. Not a url to fetch or to key a cache with.
+    """
+    parts = urlsplit(canonicalize_url(url))
+    host = parts.netloc
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    path = _AMP_SUFFIX.sub("", _SLASHES.sub("/", parts.path))
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    scheme = "https" if parts.scheme == "http" else parts.scheme
+    return urlunsplit((scheme, host, path, parts.query, ""))
+
+
+def url_digest(url):
+    """8 byte digest of the dedup key of the url, as an int"""
+    return int.from_bytes(hashlib.blake2b(dedup_key(url).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class VisitedURLIndex:
+    """
+    Per-run index of visited urls, shared by every assistant of a research run.
+    Compares dedup keys, and stores only an 8 byte digest per url instead of the string.
+    """
+    def __init__(self, urls=()):
+        self._digests = set()
+        for url in urls:
+            self.add(url)
+
+    def add(self, url):
+        """
+        Marks the url as visited
+        Returns:
+            True if no variant of the url was visited before
+        """
+        digest = url_digest(url)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def discard(self, url):
+        self._digests.discard(url_digest(url))
+
+    def __contains__(self, url):
+        return url_digest(url) in self._digests
+
+    def __len__(self):
+        return len(self._digests)
+
+
+class BloomFilter:
+    """Fixed size Bloom filter over canonical urls"""
+    def __init__(self, capacity=100_000, error_rate=0.01, bits=None):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(canonicalize_url(url).encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, url):
+        for position in self._positions(url):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, url):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(url))
+
+
+class RecentURLFilter:
+    """
+    Cross-run "recently scraped" check built from two rotating Bloom filters.
+    A url stays recent for between one and two windows; false positives are possible,
+    false negatives are not. The filters are persisted so the check survives restarts.
+    """
+    def __init__(self, path=None, window=24 * 60 * 60, capacity=100_000, error_rate=0.01, save_interval=30):
+        """
+        Args:
+            path: file the filters are saved to (optional)
+            window: seconds after which the filters rotate
+            capacity: urls per window before the false positive rate exceeds error_rate
+            save_interval: minimum seconds between two saves triggered by maybe_save()
+        """
+        self.path = path
+        self.window = window
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.save_interval = save_interval
+        self._dirty = False
+        self._last_save = 0.0
+        # The scrape cache adds and saves from worker threads
+        self._lock = threading.Lock()
+        self.current = BloomFilter(capacity, error_rate)
+        self.previous = BloomFilter(capacity, error_rate)
+        self.rotated_at = time.time()
+        self.load()
+
+    def _rotate(self):
+        now = time.time()
+        if now - self.rotated_at >= 2 * self.window:
+            self.previous = BloomFilter(self.capacity, self.error_rate)
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = now
+        elif now - self.rotated_at >= self.window:
+            self.previous = self.current
+            self.current = BloomFilter(self.capacity, self.error_rate)
+            self.rotated_at = now
+
+    def add(self, url):
+        with self._lock:
+            self._rotate()
+            self.current.add(url)
+            self._dirty = True
+
+    def __contains__(self, url):
+        with self._lock:
+            self._rotate()
+            return url in self.current or url in self.previous
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                rotated_at = float(f.readline())
+                data = f.read()
+            half = len(data) // 2
+            if half != len(self.current.bits):
+                return
+            self.current = BloomFilter(self.capacity, self.error_rate, bytearray(data[:half]))
+            self.previous = BloomFilter(self.capacity, self.error_rate, bytearray(data[half:]))
+            self.rotated_at = rotated_at
+        except (OSError, ValueError) as e:
+            print(f"Could not load recent url filter {self.path}: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp_path, "wb") as f:
+                f.write(f"{self.rotated_at}\n".encode("ascii"))
+                f.write(bytes(self.current.bits))
+                f.write(bytes(self.previous.bits))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            self._last_save = time.time()
+
+    def maybe_save(self):
+        """Saves the filters if they changed and the last save is older than save_interval"""
+        if self._dirty and time.time() - self._last_save >= self.save_interval:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Could not save recent url filter {self.path}: {e}")
+
+
+_recent = None
+
+
+def get_recent_urls(cfg=None):
+    """
+    Gets the process-wide recently scraped url filter, or None if it is disabled
+    Args:
+        cfg: Config (optional)
+    """
+    global _recent
+    if cfg is not None and not cfg.recent_url_filter_enabled:
+        return None
+    if _recent is None:
+        _recent = RecentURLFilter(
+            path=os.path.join(cfg.cache_dir if cfg else ".cache", "recent_urls.bloom"),
+            window=cfg.recent_url_window if cfg else 15 * 24 * 60 * 60,
+            capacity=cfg.recent_url_capacity if cfg else 1_000_000,
+        )
+    return _recent
@@ -8,6 +8,7 @@ from fastapi import WebSocket
 from reach_core.report_type import BasicReport, DetailedReport
 
 from .enum import ReportType
+from .scheduler import current_session
 
 class WebSocketManager:
     """Manage websockets"""
@@ -74,6 +75,8 @@ class WebSocketManager:
 async def run_agent( task, report_type, sources, websocket, cadence, retained_text, deleted_text, file_urls):
         """Run the agent."""
         start_time = datetime.datetime.now()
+        # LLM calls of this run are queued fairly against the other runs
+        current_session.set(f"ws:{id(websocket)}")
         config_path = None
 
         try:
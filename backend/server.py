@@ -7,16 +7,21 @@ from fastapi.staticfiles import StaticFiles
 from unstructured.partition.pdf import partition_pdf
 from pydantic import BaseModel
 import requests
+import asyncio
 import json
 import os
 import io
 import logging
+import threading
 from typing import List
 from reach_core.utils.websocket_manager import WebSocketManager
 from reach_core.master.prompts import component_injection, generate_report_prompt
 from fastapi.middleware.cors import CORSMiddleware
 from pptx.util import Inches, Pt
-from openai import OpenAI
+from reach_core.runtime import get_runtime
+from reach_core.utils.llm_cache import get_llm_cache
+from reach_core.utils.retry import get_retry_policy
+from reach_core.utils.scheduler import estimate_tokens, get_llm_scheduler, llm_metrics
 from PyPDF2 import PdfReader
 
 import subprocess
@@ -83,6 +88,8 @@ def startup_event():
     if not os.path.isdir("outputs"):
         os.makedirs("outputs")
     app.mount("/outputs", StaticFiles(directory="outputs"), name="outputs")
+    # Tokenizers and embedding caches load in the background instead of on the first run's event loop
+    threading.Thread(target=get_runtime().warm_up, daemon=True).start()
 
 # @app.get("/")
 # async def read_root(request: Request):
@@ -132,7 +139,29 @@ async def websocket_endpoint(websocket: WebSocket):
     except WebSocketDisconnect:
         await manager.disconnect(websocket)
 
-client = OpenAI()
+# One pooled OpenAI client for every endpoint of the process
+client = get_runtime().openai_client()
+
+
+async def scheduled_completion(session, **kwargs):
+    """
+    Runs a chat completion on the pooled OpenAI client in a worker thread, queued through the
+    process-wide LLM scheduler so the endpoints and the research runs share the rate limits
+    """
+    tokens = estimate_tokens(kwargs["messages"], kwargs.get("max_tokens"), kwargs["model"])
+    async with get_llm_scheduler(get_runtime().cfg).slot(kwargs["model"], tokens, session=session):
+        return await asyncio.to_thread(client.chat.completions.create, **kwargs)
+
+
+@app.get("/metrics")
+async def metrics():
+    cfg = get_runtime().cfg
+    llm_cache = get_llm_cache(cfg)
+    return {
+        "llm_scheduler": llm_metrics(),
+        "llm_retry": get_retry_policy(cfg).stats,
+        "llm_cache": llm_cache.metrics() if llm_cache else None,
+    }
 
 class SlideContent(BaseModel):
     title: str
@@ -163,7 +192,8 @@ async def generate_powerpoint(request: PowerPointRequest):
             Use headings to drive the narrative for the presentation and slide titles. Distill the core content down to create succinct slide content.
         """  
 
-        completion = client.chat.completions.create(
+        completion = await scheduled_completion(
+            session="generate-powerpoint",
             model="gpt-4o-2024-08-06",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that creates PowerPoint presentations. Generate a presentation structure based on the user's request by calling the create_presentation function."},
@@ -272,7 +302,8 @@ async def process_pdf(request: PDFProcessRequest):
         text_content = extract_text_from_pdf(pdf_content)
         print(f'Extracted text content length: {len(text_content)}')
 
-        response = client.chat.completions.create(
+        response = await scheduled_completion(
+            session="process-pdf",
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are an expert legal assistant that analyzes documents and extracts key information. Format the content by calling the analyze_document function. Ensure you consider all pages of the document in your analysis."},
@@ -341,7 +372,8 @@ async def create_chart(request: ChartRequest):
         prompt = base_prompt
 
     try:
-        completion = client.chat.completions.create(
+        completion = await scheduled_completion(
+            session="create-chart",
             model="gpt-4o-2024-08-06",
             messages=[
                 {"role": "system", "content": "You are an expert D3.js developer."},
@@ -374,7 +406,8 @@ async def condense_findings(request: CondenseRequest):
     """
 
     try:
-        completion = client.chat.completions.create(
+        completion = await scheduled_completion(
+            session="condense-findings",
             model="gpt-4o-2024-08-06",
             messages=[
                 {"role": "system", "content": prompt},
@@ -538,8 +571,8 @@ async def generate_diagram(request: DiagramRequest):
         else:
             prompt = base_prompt
 
-        client = OpenAI()
-        completion = client.chat.completions.create(
+        completion = await scheduled_completion(
+            session="generate-diagram",
             model="gpt-4o-2024-08-06",
             messages=[
                 {"role": "system", "content": "You are a helpful assistant that creates Mermaid.js diagrams."},
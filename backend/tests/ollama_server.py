@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+
+class StandInOllama:
+    """
+    Minimal Ollama server for tests: answers POST /api/chat on a local port with scripted replies,
+    as one JSON object or as NDJSON lines when the request asks to stream.
+    Records the requests, the connections opened and the peak number of requests in flight.
+    """
+    def __init__(self, reply, delay=0.0):
+        """
+        Args:
+            reply: function of the request body returning (status code, list of JSON objects)
+            delay: seconds to wait before answering each request
+        """
+        self.reply = reply
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self.active = 0
+        self.peak = 0
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            # Keep-alive: serve requests on the connection until the client closes it
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = dict(
+                    line.lower().split(": ", 1) for line in head.decode("latin-1").split("\r\n")[1:] if ": " in line
+                )
+                body = json.loads(await reader.readexactly(int(headers.get("content-length", 0))))
+                await self._respond(body, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, body, writer):
+        self.requests.append(body)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            status, chunks = self.reply(body)
+        finally:
+            self.active -= 1
+
+        if not body.get("stream"):
+            payload = json.dumps(chunks[0]).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} OK\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n".encode("ascii") + payload
+            )
+            await writer.drain()
+            return
+
+        writer.write(
+            f"HTTP/1.1 {status} OK\r\nContent-Type: application/x-ndjson\r\n"
+            "Transfer-Encoding: chunked\r\n\r\n".encode("ascii")
+        )
+        for chunk in chunks:
+            line = json.dumps(chunk).encode("utf-8") + b"\n"
+            writer.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+            await writer.drain()
+            # Lets the client read each line on its own, as it would from a generating model
+            await asyncio.sleep(0.001)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def message(content, done=False, model="llama3"):
+    """One /api/chat response object carrying the next content of the assistant message"""
+    return {"model": model, "message": {"role": "assistant", "content": content}, "done": done}
@@ -0,0 +1,192 @@
+import asyncio
+import string
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+
+import httpx
+
+from reach_core.context.compression import ContextCompressor
+from reach_core.memory import batcher, cache
+from reach_core.memory.embeddings import wrap_embeddings
+from reach_core.scraper.cache import ScrapeCache
+from reach_core.scraper.engine import ScrapeEngine
+from reach_core.scraper.parsing import ParsePool, parse_html_fast
+from reach_core.scraper.scraper import Scraper
+from reach_core.utils import tokens
+from reach_core.utils.cache import DiskCache
+
+# A responsive loop wakes a 10 ms sleeper within a few ms; blocking calls below take 200 ms or more
+PROBE_INTERVAL = 0.01
+MAX_LAG = 0.1
+
+
+async def measure_lag(work):
+    """
+    Runs the coroutine while a probe sleeps PROBE_INTERVAL in a loop
+    Returns:
+        (result of work, worst delay of the probe past its wake up time in seconds)
+    """
+    stop = asyncio.Event()
+
+    async def probe():
+        worst = 0.0
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(PROBE_INTERVAL)
+            worst = max(worst, time.perf_counter() - started - PROBE_INTERVAL)
+        return worst
+
+    probing = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    try:
+        result = await work
+    finally:
+        stop.set()
+    return result, await probing
+
+
+class SlowEmbeddings:
+    """Letter frequency vectors, served after a delay like a remote embeddings API"""
+    delay = 0.2
+
+    @staticmethod
+    def _vector(text):
+        text = text.lower()
+        return [float(text.count(letter)) + 1.0 for letter in string.ascii_lowercase]
+
+    def embed_documents(self, texts):
+        time.sleep(self.delay)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        return self._vector(text)
+
+    async def aembed_documents(self, texts):
+        await asyncio.sleep(self.delay)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text):
+        await asyncio.sleep(self.delay)
+        return self._vector(text)
+
+
+def make_pages(count, paragraphs=2000):
+    sentence = "The research agent gathers sources and compresses them into context. "
+    return [
+        {"url": f"https://example.com/{i}", "raw_content": "\n\n".join(sentence * 3 for _ in range(paragraphs))}
+        for i in range(count)
+    ]
+
+
+def make_html(paragraphs=5000):
+    body = "".join(f"<div><p>Paragraph {i} with <a href='#'>a link</a> and <em>emphasis</em>.</p></div>"
+                   for i in range(paragraphs))
+    return f"<html><head><script>var x = 1;</script></head><body>{body}</body></html>".encode("utf-8")
+
+
+def test_aget_context_keeps_event_loop_responsive():
+    async def compress():
+        pages = make_pages(3)
+        compressors = [ContextCompressor(pages, SlowEmbeddings()) for _ in range(3)]
+        return await asyncio.gather(*(c.aget_context("research sources", max_results=3) for c in compressors))
+
+    results, lag = asyncio.run(measure_lag(compress()))
+
+    assert all(docs for _, docs in results)
+    assert lag < MAX_LAG
+
+
+def slowed(fn, delay):
+    def slow(*args, **kwargs):
+        time.sleep(delay)
+        return fn(*args, **kwargs)
+    return slow
+
+
+def test_embedding_wrappers_keep_event_loop_responsive(tmp_path, monkeypatch):
+    # The stack Memory builds: cache on SQLite, then the batcher counting tokens, then the provider.
+    # Disk queries and the first tokenizer load (a vocabulary download) are slowed down to show up.
+    monkeypatch.setattr(DiskCache, "get_many", slowed(DiskCache.get_many, SlowEmbeddings.delay))
+    monkeypatch.setattr(DiskCache, "set_many", slowed(DiskCache.set_many, SlowEmbeddings.delay))
+    monkeypatch.setattr(tokens, "get_encoding", lru_cache(maxsize=None)(slowed(lambda model=None: None,
+                                                                              SlowEmbeddings.delay)))
+    monkeypatch.setattr(cache, "_cache", None)
+    monkeypatch.setattr(batcher, "_batchers", {})
+    cfg = SimpleNamespace(
+        cache_dir=str(tmp_path), embedding_cache_enabled=True, embedding_cache_disk=True,
+        embedding_cache_max_entries=4096, embedding_cache_disk_max_entries=50_000,
+        embedding_cache_disk_ttl=60, embedding_batch_max_items=512, embedding_batch_max_tokens=100_000,
+        embedding_max_concurrency=4,
+    )
+
+    async def compress():
+        embeddings = wrap_embeddings(SlowEmbeddings(), cfg)
+        pages = make_pages(3, paragraphs=200)
+        compressors = [ContextCompressor(pages, embeddings) for _ in range(2)]
+        return await asyncio.gather(*(c.aget_context("research sources", max_results=3) for c in compressors))
+
+    results, lag = asyncio.run(measure_lag(compress()))
+
+    assert all(docs for _, docs in results)
+    assert cache._cache.metrics()["misses"]
+    assert lag < MAX_LAG
+
+
+def test_scrape_cache_keeps_event_loop_responsive(tmp_path, monkeypatch):
+    monkeypatch.setattr(DiskCache, "get_many", slowed(DiskCache.get_many, SlowEmbeddings.delay))
+    monkeypatch.setattr(DiskCache, "set_many", slowed(DiskCache.set_many, SlowEmbeddings.delay))
+    page = b"<html><body>" + b"<p>Research sources are scraped once and cached.</p>" * 20 + b"</body></html>"
+
+    async def scrape():
+        engine = ScrapeEngine()
+        engine.client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, headers={"Content-Type": "text/html"}, content=page)
+        ))
+        scraper = Scraper([f"https://example.com/{i}" for i in range(3)], "test", "bs", engine=engine,
+                          cache=ScrapeCache(str(tmp_path / "scrape.sqlite")), parse_pool=ParsePool(1))
+        try:
+            # Twice: misses that are saved, then hits
+            return [await scraper.arun() for _ in range(2)]
+        finally:
+            scraper.parse_pool.shutdown()
+            await engine.aclose()
+
+    runs, lag = asyncio.run(measure_lag(scrape()))
+
+    assert all(len(pages) == 3 for pages in runs)
+    assert lag < MAX_LAG
+
+
+def test_get_context_blocks_event_loop():
+    # Control for the probe: the blocking path stalls the loop for at least one embedding call
+    async def compress():
+        return ContextCompressor(make_pages(1), SlowEmbeddings()).get_context("research sources", max_results=3)
+
+    _, lag = asyncio.run(measure_lag(compress()))
+
+    assert lag >= SlowEmbeddings.delay
+
+
+def test_parse_pool_keeps_event_loop_responsive():
+    pages = [make_html() for _ in range(6)]
+
+    async def parse():
+        pool = ParsePool(max_workers=2)
+        try:
+            # Workers are spawned before measuring, as the shared pool is after the first scrape
+            await pool.run(parse_html_fast, pages[0], "utf-8")
+            started = time.perf_counter()
+            texts, lag = await measure_lag(
+                asyncio.gather(*(pool.run(parse_html_fast, page, "utf-8") for page in pages))
+            )
+            return texts, lag, time.perf_counter() - started
+        finally:
+            pool.shutdown()
+
+    texts, lag, elapsed = asyncio.run(parse())
+
+    assert all("Paragraph 4999 with a link and emphasis." in text for text in texts)
+    assert lag < MAX_LAG
+    assert elapsed > MAX_LAG, "parsing too fast to tell a blocked loop apart, use larger pages"
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import httpx
+
+from reach_core.scraper.engine import ScrapeEngine
+from reach_core.scraper.health import CLOSED, HALF_OPEN, OPEN, HostHealthRegistry
+from reach_core.scraper.scraper import Scraper
+
+COOL_DOWN = 0.05
+
+
+def open_registry(url, path=None):
+    registry = HostHealthRegistry(path=path, failure_threshold=1, cool_down=COOL_DOWN)
+    registry.record(url, "error")
+    return registry
+
+
+def test_probe_that_never_reports_opens_the_circuit_again():
+    url = "https://flaky.example/page"
+    registry = open_registry(url)
+    assert not registry.allow(url)
+    time.sleep(COOL_DOWN)
+    assert registry.allow(url)
+    assert registry.stats()["flaky.example"]["state"] == HALF_OPEN
+
+    # The probe is lost: no outcome is recorded
+    assert not registry.allow(url)
+    time.sleep(COOL_DOWN)
+    assert not registry.allow(url)
+    assert registry.stats()["flaky.example"]["state"] == OPEN
+    time.sleep(COOL_DOWN)
+    assert registry.allow(url)
+
+
+def test_half_open_state_loaded_from_disk_recovers(tmp_path):
+    url = "https://flaky.example/page"
+    path = str(tmp_path / "host_health.json")
+    registry = open_registry(url, path)
+    time.sleep(COOL_DOWN)
+    assert registry.allow(url)
+    registry.save()
+
+    restarted = HostHealthRegistry(path=path, failure_threshold=1, cool_down=COOL_DOWN)
+    time.sleep(COOL_DOWN)
+    assert not restarted.allow(url)
+    time.sleep(COOL_DOWN)
+    assert restarted.allow(url)
+
+
+def make_scraper(urls, registry, handler, **kwargs):
+    engine = ScrapeEngine()
+    engine.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return Scraper(urls, "test", "bs", engine=engine, host_health=registry, **kwargs)
+
+
+async def html(request):
+    return httpx.Response(200, headers={"Content-Type": "text/html"}, content=b"<p>" + b"text " * 100 + b"</p>")
+
+
+def test_cancelled_probe_is_recorded():
+    url = "https://slow.example/page"
+    registry = open_registry(url)
+    time.sleep(COOL_DOWN)
+
+    async def slow(request):
+        await asyncio.sleep(1)
+        return await html(request)
+
+    async def main():
+        scraper = make_scraper([url], registry, slow)
+        return await scraper.arun(deadline=0.05)
+
+    assert asyncio.run(main()) == []
+    entry = registry.stats()["slow.example"]
+    assert entry["state"] == OPEN
+    assert entry["errors"] == 2
+
+
+def test_unexpected_error_is_recorded():
+    url = "https://broken.example/page"
+    registry = HostHealthRegistry(failure_threshold=1, cool_down=COOL_DOWN)
+
+    async def broken(request):
+        raise ValueError("unexpected")
+
+    async def main():
+        return await make_scraper([url], registry, broken).arun()
+
+    assert asyncio.run(main()) == []
+    assert registry.stats()["broken.example"]["state"] == OPEN
+
+
+def test_urls_asked_for_are_scraped_through_open_circuits():
+    url = "https://flaky.example/page"
+    registry = open_registry(url)
+
+    async def main(skip_unhealthy):
+        return await make_scraper([url], registry, html, skip_unhealthy=skip_unhealthy).arun()
+
+    assert asyncio.run(main(True)) == []
+    pages = asyncio.run(main(False))
+    assert [page["url"] for page in pages] == [url]
+    assert registry.stats()["flaky.example"]["state"] == CLOSED
@@ -0,0 +1,36 @@
+import pytest
+
+from reach_core.scraper.parsing import guess_encoding, parse_html, parse_html_lxml
+
+TEXT = "Crème brûlée in Zürich, “quoted” façade"
+
+
+def page(body_encoding, meta="", bom=b""):
+    html = f"<html><head>{meta}<title>t</title></head><body><p>{TEXT}</p></body></html>"
+    return bom + html.encode(body_encoding)
+
+
+@pytest.mark.parametrize("content, expected", [
+    (page("utf-8"), "utf-8"),
+    (page("windows-1252"), "windows-1252"),
+    (page("utf-8", bom=b"\xef\xbb\xbf"), None),
+    (page("windows-1252", meta="<meta charset='windows-1252'>"), None),
+    (page("windows-1252", meta='<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'), None),
+])
+def test_guess_encoding(content, expected):
+    assert guess_encoding(content) == expected
+
+
+@pytest.mark.parametrize("parse", [parse_html_lxml, parse_html])
+@pytest.mark.parametrize("content", [
+    page("utf-8"),
+    page("windows-1252"),
+    page("utf-8", bom=b"\xef\xbb\xbf"),
+    page("windows-1252", meta="<meta charset='windows-1252'>"),
+], ids=["utf-8", "windows-1252", "utf-8 bom", "windows-1252 meta"])
+def test_pages_without_declared_charset_are_not_garbled(parse, content):
+    assert parse(content, None) == TEXT
+
+
+def test_declared_charset_wins():
+    assert parse_html_lxml(page("windows-1252"), "windows-1252") == TEXT
@@ -0,0 +1,86 @@
+import asyncio
+import contextlib
+import json
+import types
+
+import pytest
+
+from reach_core.utils import llm
+from reach_core.utils.llm_cache import LLMResponseCache
+
+MESSAGES = [{"role": "user", "content": "task: climate policy"}]
+
+
+class FakeScheduler:
+    @contextlib.asynccontextmanager
+    async def slot(self, model, tokens, measure_latency=True):
+        yield
+
+
+class Policy:
+    """Retry policy that answers with the primary model, or with the fallback one if failover is set"""
+    failover = False
+
+    async def run(self, call, model, fallback_model=None, sink=None):
+        return await call(fallback_model if self.failover else model, None)
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    answers = []
+    calls = []
+
+    class Provider:
+        def __init__(self, model):
+            self.model = model
+
+        async def get_chat_response(self, messages, stream, sink):
+            calls.append(self.model)
+            return answers.pop(0)
+
+    runtime = types.SimpleNamespace(
+        cfg=types.SimpleNamespace(fallback_llm_model="fallback"),
+        llm=lambda provider, model, temperature, max_tokens: Provider(model),
+    )
+    cache = LLMResponseCache()
+    policy = Policy()
+    monkeypatch.setattr(llm, "get_runtime", lambda: runtime)
+    monkeypatch.setattr(llm, "get_llm_cache", lambda cfg: cache)
+    monkeypatch.setattr(llm, "get_llm_scheduler", lambda cfg: FakeScheduler())
+    monkeypatch.setattr(llm, "get_retry_policy", lambda cfg: policy)
+    monkeypatch.setattr(llm, "estimate_tokens", lambda messages, max_tokens, model: 1)
+    return types.SimpleNamespace(cache=cache, answers=answers, calls=calls, policy=policy)
+
+
+def complete(**kwargs):
+    return asyncio.run(llm.create_chat_completion(
+        messages=MESSAGES, model="primary", temperature=0, llm_provider="openai", **kwargs
+    ))
+
+
+def test_response_the_caller_cannot_parse_is_not_cached(setup):
+    setup.answers.extend(["Sure! Here are the queries:", '["a", "b"]'])
+
+    assert complete(validate=json.loads) == "Sure! Here are the queries:"
+    assert complete(validate=json.loads) == '["a", "b"]'
+    assert complete(validate=json.loads) == '["a", "b"]'
+    assert setup.calls == ["primary", "primary"]
+
+
+def test_cached_response_the_caller_cannot_parse_is_evicted(setup):
+    setup.cache.set("openai:primary", MESSAGES, "not json")
+    setup.answers.append('["a"]')
+
+    assert complete(validate=json.loads) == '["a"]'
+    assert setup.cache.get("openai:primary", MESSAGES) == '["a"]'
+    assert setup.calls == ["primary"]
+
+
+def test_failover_response_is_cached_under_the_model_that_answered(setup):
+    setup.policy.failover = True
+    setup.answers.append('["a"]')
+
+    assert complete() == '["a"]'
+    assert setup.calls == ["fallback"]
+    assert setup.cache.get("openai:primary", MESSAGES) is None
+    assert setup.cache.get("openai:fallback", MESSAGES) == '["a"]'
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from reach_core.llm_provider.ollama.ollama import OllamaProvider
+
+from ollama_server import StandInOllama, message
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_json(self, data):
+        self.sent.append(data)
+
+
+def run(server, calls, monkeypatch, max_connections=8):
+    """Starts the stand-in server, points OLLAMA_BASE_URL at it and awaits calls(server)"""
+    monkeypatch.setenv("OLLAMA_MAX_CONNECTIONS", str(max_connections))
+
+    async def main():
+        async with server:
+            monkeypatch.setenv("OLLAMA_BASE_URL", server.url)
+            return await calls(server)
+
+    return asyncio.run(main())
+
+
+def test_sends_structured_chat_messages(monkeypatch):
+    server = StandInOllama(lambda body: (200, [message("Paris", done=True)]))
+    messages = [
+        {"role": "system", "content": "You are a research assistant."},
+        {"role": "user", "content": "What is the capital of France?"},
+    ]
+
+    async def calls(server):
+        return await OllamaProvider("llama3", 0.2, 64).get_chat_response(messages, stream=False)
+
+    assert run(server, calls, monkeypatch) == "Paris"
+    request, = server.requests
+    assert request["model"] == "llama3"
+    assert request["messages"] == messages
+    assert request["stream"] is False
+    assert request["options"] == {"temperature": 0.2, "num_predict": 64}
+
+
+def test_streamed_chunks_are_assembled_and_sent_by_paragraph(monkeypatch):
+    chunks = [message("First"), message(" paragraph.\n"), message("Second"), message(" one."),
+              message("", done=True)]
+    server = StandInOllama(lambda body: (200, chunks))
+    websocket = RecordingWebSocket()
+
+    async def calls(server):
+        return await OllamaProvider("llama3", 0, None).get_chat_response(
+            [{"role": "user", "content": "Write two paragraphs"}], stream=True, websocket=websocket
+        )
+
+    assert run(server, calls, monkeypatch) == "First paragraph.\nSecond one."
+    assert server.requests[0]["stream"] is True
+    assert "num_predict" not in server.requests[0]["options"]
+    assert websocket.sent == [
+        {"type": "report", "output": "First paragraph.\n"},
+        {"type": "report", "output": "Second one."},
+    ]
+
+
+def test_stream_stops_at_done(monkeypatch):
+    # Anything after the done object is not part of the message
+    server = StandInOllama(lambda body: (200, [message("Done."), message("", done=True), message(" Extra")]))
+
+    async def calls(server):
+        return await OllamaProvider("llama3", 0, None).get_chat_response(
+            [{"role": "user", "content": "Hi"}], stream=True, websocket=RecordingWebSocket()
+        )
+
+    assert run(server, calls, monkeypatch) == "Done."
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_error_objects_raise(monkeypatch, stream):
+    server = StandInOllama(lambda body: (200, [{"error": "model 'missing' not found"}]))
+
+    async def calls(server):
+        return await OllamaProvider("missing", 0, None).get_chat_response(
+            [{"role": "user", "content": "Hi"}], stream=stream, websocket=RecordingWebSocket()
+        )
+
+    with pytest.raises(RuntimeError, match="model 'missing' not found"):
+        run(server, calls, monkeypatch)
+
+
+def test_http_errors_raise(monkeypatch):
+    server = StandInOllama(lambda body: (500, [{"error": "out of memory"}]))
+
+    async def calls(server):
+        return await OllamaProvider("llama3", 0, None).get_chat_response(
+            [{"role": "user", "content": "Hi"}], stream=False
+        )
+
+    with pytest.raises(httpx.HTTPStatusError):
+        run(server, calls, monkeypatch)
+
+
+def test_concurrent_calls_share_the_pooled_client(monkeypatch):
+    delay = 0.2
+    server = StandInOllama(lambda body: (200, [message(body["messages"][0]["content"].upper(), done=True)]),
+                           delay=delay)
+
+    async def calls(server):
+        providers = [OllamaProvider("llama3", 0, None) for _ in range(8)]
+        assert len({id(provider.client) for provider in providers}) == 1
+        started = time.perf_counter()
+        answers = await asyncio.gather(*(
+            provider.get_chat_response([{"role": "user", "content": f"question {i}"}], stream=False)
+            for i, provider in enumerate(providers)
+        ))
+        elapsed = time.perf_counter() - started
+        # A second round reuses the kept-alive connections instead of opening new ones
+        await asyncio.gather(*(
+            provider.get_chat_response([{"role": "user", "content": "again"}], stream=False)
+            for provider in providers
+        ))
+        return answers, elapsed
+
+    answers, elapsed = run(server, calls, monkeypatch, max_connections=4)
+
+    assert answers == [f"QUESTION {i}" for i in range(8)]
+    # Eight calls through four connections take two rounds, not eight
+    assert server.peak == 4
+    assert elapsed < 4 * delay
+    assert server.connections == 4
@@ -0,0 +1,20 @@
+import asyncio
+import os
+
+from reach_core.scraper.parsing import ParsePool
+
+
+def test_broken_pool_drops_the_page_and_restarts():
+    async def main():
+        pool = ParsePool(max_workers=1)
+        try:
+            # The worker dies on this page, as if it had been OOM killed
+            dropped = await pool.run(os._exit, 1)
+            after = await pool.run(len, b"next page")
+        finally:
+            pool.shutdown()
+        return dropped, after
+
+    dropped, after = asyncio.run(main())
+    assert dropped == ""
+    assert after == len(b"next page")
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import httpx
+
+from reach_core.scraper.engine import ScrapeEngine
+
+PAGE = b"<html><body>" + b"<p>content</p>" * 20 + b"</body></html>"
+
+
+def make_engine(delays, max_connections=4, max_connections_per_host=1):
+    """Engine whose client answers every host after delays[host] seconds"""
+    async def handler(request):
+        await asyncio.sleep(delays.get(request.url.host, 0))
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, content=PAGE)
+
+    engine = ScrapeEngine(max_connections=max_connections, max_connections_per_host=max_connections_per_host)
+    engine.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return engine
+
+
+def test_requests_queued_on_a_slow_host_do_not_hold_global_slots():
+    async def main():
+        engine = make_engine({"slow.example": 0.3})
+        slow = [asyncio.create_task(engine.fetch(f"https://slow.example/{i}")) for i in range(8)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        result = await engine.fetch("https://idle.example/")
+        waited = time.monotonic() - started
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+        await engine.aclose()
+        return result, waited
+
+    result, waited = asyncio.run(main())
+    assert result.kind == "html"
+    assert waited < 0.2
+
+
+def test_idle_hosts_are_forgotten():
+    async def main():
+        engine = make_engine({})
+        await asyncio.gather(*(engine.fetch(f"https://host{i}.example/") for i in range(50)))
+        await asyncio.gather(*(engine.fetch("https://same.example/") for _ in range(5)))
+        await engine.aclose()
+        return engine
+
+    engine = asyncio.run(main())
+    assert engine.stats["fetched"] == 55
+    assert engine._host_limits == {}
@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+import httpx
+
+from reach_core.retrievers.cache import WINDOW_TTLS, SearchCache
+
+RESULTS = [{"href": "https://example.com", "body": "result"}]
+
+
+def test_disk_hit_is_kept_in_memory_only_for_what_is_left_of_its_ttl(tmp_path, monkeypatch):
+    path = str(tmp_path / "search.sqlite")
+    SearchCache(disk_path=path).set("climate policy", RESULTS, "daily")
+
+    # A restart most of a window later: the disk entry has little time left
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + WINDOW_TTLS["day"] - 10)
+    cache = SearchCache(disk_path=path)
+    assert cache.get("climate policy", "daily") == RESULTS
+    assert cache.stats["disk_hits"] == 1
+
+    monkeypatch.setattr(time, "time", lambda: now + WINDOW_TTLS["day"] + 10)
+    assert cache.get("climate policy", "daily") is None
+
+
+def search_with_cadence(cadence, monkeypatch):
+    """Runs SearxSearch.asearch_many without a cache and returns the params SearxNG received"""
+    from reach_core.retrievers.searx import searx
+
+    received = []
+
+    def handler(request):
+        received.append(dict(request.url.params))
+        return httpx.Response(200, json={"results": [{"url": "https://example.com", "content": "result"}]})
+
+    client = searx.SearxClient(host="http://searx.test")
+    client.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(searx, "get_search_cache", lambda cfg: None)
+    monkeypatch.setattr(searx, "get_searx_client", lambda cfg: client)
+    asyncio.run(searx.SearxSearch.asearch_many(["climate policy"], max_results=1, cadence=cadence))
+    return received
+
+
+def test_cadence_window_is_sent_as_time_range(monkeypatch):
+    assert search_with_cadence("weekly", monkeypatch)[0]["time_range"] == "week"
+    assert "time_range" not in search_with_cadence("", monkeypatch)[0]